@@ -236,6 +236,7 @@ alias qs='$play/qs.sh'
 alias wf='python $happy/wf_cal.py'
 alias getrst='python $play/vasp/get_restart.py'
 alias getrst.sh='bash $happy/restart.sh'
+alias fconv='python $play/vasp/convergence.py'
 alias getchg='python $happy/getchg.py'
 alias gm='bash $happy/getmetal.sh'
 alias getallmag='python $happy/get_allmagmoms.py'
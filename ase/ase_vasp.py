@@ -1,17 +1,26 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 from ase.io import *
-from sys import argv, path
+from sys import argv
 import os
 from ase.calculators.vasp import Vasp
 import ase.calculators.vasp as vasp_calculator
 from ase.io import read, write
 import numpy as np
-import subprocess
 import shutil
 from ase.build import molecule
 
 
+try:
+    from vasp.ase_convert import convert
+except ImportError:
+    try:
+        from ase_convert import convert
+    except ImportError:
+        # copied into a job folder, away from the repo: plain ase read/write
+        def convert(src, dst, index=':', atoms=None):
+            write(dst, read(src, index=index) if atoms is None else atoms)
+
 
 mode = argv[1] if len(argv) > 1 else 'slab'
 valid_modes = {"slab", "vib", "sp", "charge", "dos", "wf", "gas", "fiscs"}
@@ -273,5 +282,5 @@ from ase.io.trajectory import Trajectory
 traj2=Trajectory('final_with_calculator.traj', 'w') 
 traj2.write(atoms)
 print ('after write')
-subprocess.call('ase convert -f final_with_calculator.traj final_with_calculator.json', shell=True)
-subprocess.call('ase convert -f OUTCAR full_relax.json', shell=True)
+convert('final_with_calculator.traj', 'final_with_calculator.json')
+convert('OUTCAR', 'full_relax.json')
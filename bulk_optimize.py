@@ -1,10 +1,21 @@
 from ase import Atom, Atoms
 import ase.calculators.vasp as vasp_calculator
 import os
-import subprocess
 from ase.build import bulk 
 import numpy as np
 import shutil
+from ase.io import read, write
+
+
+try:
+    from vasp.ase_convert import convert
+except ImportError:
+    try:
+        from ase_convert import convert
+    except ImportError:
+        # copied into a job folder, away from the repo: plain ase read/write
+        def convert(src, dst, index=':', atoms=None):
+            write(dst, read(src, index=index) if atoms is None else atoms)
 
 # lattice using isif=3
 
@@ -52,5 +63,5 @@ from ase.io.trajectory import Trajectory
 traj2=Trajectory('final_with_calculator.traj', 'w')
 traj2.write(atoms)
 print ('after write')
-subprocess.call('ase convert -f final_with_calculator.traj final_with_calculator.json', shell=True)
+convert('final_with_calculator.traj', 'final_with_calculator.json')
 
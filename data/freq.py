@@ -1,10 +1,15 @@
 import pandas as pd
 import ast
 import os
+import warnings
 from typing import Optional, List, Union
 import numpy as np
 
 
+# Bump when the layout of the binary sidecar cache changes
+CACHE_VERSION = 1
+
+
 class FrequencyData:
     """
     Class for loading and querying frequency data.
@@ -24,13 +29,19 @@ class FrequencyData:
     
     # Get frequency list directly
     freqs = data.get_freq('CO2', reference='Ara')
+    co2, h2o = data.get_freqs([('CO2', 'Ara'), ('H2O', 'Ara')])
     
     # Search and filter
     all_ara = data.filter(reference='Ara')
     gas_only = data.filter(status='gas')
+    
+    Frequencies are stored as one flat float64 array plus row offsets and are
+    returned as read-only NumPy views. The parsed data is cached in a binary
+    sidecar file next to the CSV (e.g. frequencies.npz), which is rebuilt
+    automatically when the CSV changes.
     """
     
-    def __init__(self, filepath='frequencies.csv'):
+    def __init__(self, filepath='frequencies.csv', use_cache=True):
         """
         Initialize and load frequency data.
         
@@ -38,11 +49,13 @@ class FrequencyData:
         -----------
         filepath : str
             Path to the CSV file (default: 'frequencies.csv')
+        use_cache : bool
+            Read/write the binary sidecar cache (default: True)
         """
-        self._load_data(filepath)
+        self._load_data(filepath, use_cache)
     
-    def _load_data(self, filepath):
-        """Load and parse the CSV file."""
+    def _load_data(self, filepath, use_cache=True):
+        """Load the frequency data from the sidecar cache or the CSV file."""
         # Get the directory of this script
         script_dir = os.path.dirname(os.path.abspath(__file__))
         
@@ -50,19 +63,141 @@ class FrequencyData:
         if not os.path.isabs(filepath):
             filepath = os.path.join(script_dir, filepath)
         
-        # Load the CSV file
-        self.df = pd.read_csv(filepath)
+        self.filepath = filepath
+        self.cache_path = os.path.splitext(filepath)[0] + '.npz'
+        
+        data = self._read_cache() if use_cache else None
+        if data is None:
+            data = self._parse_csv()
+            if use_cache:
+                self._write_cache(data)
+        
+        columns, values, offsets = data
+        
+        # Flat frequency storage; each row's frequencies are a read-only view
+        values.flags.writeable = False
+        self._freq_values = values
+        self._freq_offsets = offsets
+        
+        self.df = pd.DataFrame(columns)
+        self.df['frequencies'] = [values[start:stop] for start, stop in zip(offsets[:-1], offsets[1:])]
+        
+        # Add number of frequencies column for convenience
+        self.df['num_freqs'] = np.diff(offsets)
+        
+        self._build_index()
+    
+    def _build_index(self):
+        """
+        Build a hash index from (species, reference, status) to row positions.
+        
+        Every row is registered under all 8 combinations of its key fields with
+        None as a wildcard, so any query of get/get_freq/filter is one lookup.
+        Row positions are kept in file order so the first match is unchanged.
+        """
+        index = {}
+        keys = zip(self.df['species_name'], self.df['reference'], self.df['status'])
+        for row, (species, reference, status) in enumerate(keys):
+            for s in (species, None):
+                for r in (reference, None):
+                    for t in (status, None):
+                        index.setdefault((s, r, t), []).append(row)
+        
+        self._index = {key: np.array(rows, dtype=np.intp) for key, rows in index.items()}
+        self._no_rows = np.array([], dtype=np.intp)
+    
+    def _lookup(self, species: Optional[str] = None, reference: Optional[str] = None,
+                status: Optional[str] = None) -> np.ndarray:
+        """Row positions matching the given fields (None matches anything)."""
+        return self._index.get((species, reference, status), self._no_rows)
+    
+    def _select(self, rows: np.ndarray, copy: bool) -> pd.DataFrame:
+        """Return the given rows, with writable frequency arrays if copy is True."""
+        result = self.df.iloc[rows]
+        if copy:
+            result = result.copy()
+            result['frequencies'] = [np.array(f) for f in result['frequencies']]
+        return result
+    
+    def _source_stamp(self):
+        """Modification time and size of the CSV file, used to validate the cache."""
+        stat = os.stat(self.filepath)
+        return np.array([stat.st_mtime_ns, stat.st_size], dtype=np.int64)
+    
+    def _parse_csv(self):
+        """
+        Parse the CSV file into (columns, values, offsets).
+        
+        columns maps the non-frequency column names to arrays, values is the flat
+        float64 array of all frequencies and offsets[i]:offsets[i+1] is row i.
+        """
+        df = pd.read_csv(self.filepath)
         
         # Convert the frequencies column from string to list
-        self.df['frequencies'] = self.df['frequencies'].apply(
+        freqs = df.pop('frequencies').apply(
             lambda x: ast.literal_eval(x) if pd.notna(x) and x.strip() else []
         )
         
-        # Add number of frequencies column for convenience
-        self.df['num_freqs'] = self.df['frequencies'].apply(len)
+        lengths = freqs.apply(len).to_numpy(dtype=np.int64)
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        values = np.fromiter((f for row in freqs for f in row), dtype=np.float64, count=offsets[-1])
+        
+        columns = {col: df[col].to_numpy() for col in df.columns}
+        return columns, values, offsets
+    
+    def _read_cache(self):
+        """Return (columns, values, offsets) from the sidecar cache, or None if stale."""
+        if not os.path.exists(self.cache_path):
+            return None
+        
+        try:
+            with np.load(self.cache_path, allow_pickle=False) as cache:
+                if (int(cache['__version__']) != CACHE_VERSION or
+                        not np.array_equal(cache['__source__'], self._source_stamp())):
+                    return None
+                
+                columns = {}
+                for col, is_text in zip(cache['__columns__'], cache['__text__']):
+                    array = cache[f'col:{col}']
+                    if is_text:
+                        # Empty strings were missing values in the CSV
+                        array = pd.Series(array, dtype=object).replace('', np.nan).to_numpy()
+                    columns[str(col)] = array
+                
+                return columns, cache['__values__'], cache['__offsets__']
+        except Exception as e:
+            warnings.warn(f"Could not read frequency cache {self.cache_path}: {e}")
+            return None
+    
+    def _write_cache(self, data):
+        """Write (columns, values, offsets) to the sidecar cache."""
+        columns, values, offsets = data
+        
+        arrays = {
+            '__version__': np.array(CACHE_VERSION),
+            '__source__': self._source_stamp(),
+            '__values__': values,
+            '__offsets__': offsets,
+            '__columns__': np.array(list(columns), dtype=str),
+            '__text__': np.array([array.dtype == object for array in columns.values()]),
+        }
+        for col, array in columns.items():
+            if array.dtype == object:
+                array = pd.Series(array).fillna('').astype(str).to_numpy(dtype=str)
+            arrays[f'col:{col}'] = array
+        
+        # Write to a temporary file first so readers never see a partial cache
+        tmp_path = self.cache_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            warnings.warn(f"Could not write frequency cache {self.cache_path}: {e}")
     
     def get(self, species: str, reference: Optional[str] = None, 
-            status: Optional[str] = None) -> pd.DataFrame:
+            status: Optional[str] = None, copy: bool = False) -> pd.DataFrame:
         """
         Get frequency data for a specific species.
         
@@ -74,6 +209,8 @@ class FrequencyData:
             Reference name (e.g., 'Ara', 'PengRole2020')
         status : str, optional
             Status ('gas' or 'ads')
+        copy : bool
+            If True, frequencies are writable copies instead of read-only views
             
         Returns:
         --------
@@ -86,18 +223,10 @@ class FrequencyData:
         data.get('CO2', reference='Ara')
         data.get('H', status='ads')
         """
-        mask = self.df['species_name'] == species
-        
-        if reference is not None:
-            mask &= self.df['reference'] == reference
-        
-        if status is not None:
-            mask &= self.df['status'] == status
-        
-        return self.df[mask].copy()
+        return self._select(self._lookup(species, reference, status), copy)
     
     def get_freq(self, species: str, reference: Optional[str] = None, 
-                 status: Optional[str] = None) -> List[float]:
+                 status: Optional[str] = None, copy: bool = False) -> np.ndarray:
         """
         Get frequency list directly for a species.
         Returns the first match if multiple entries exist.
@@ -110,26 +239,60 @@ class FrequencyData:
             Reference name
         status : str, optional
             Status ('gas' or 'ads')
+        copy : bool
+            If True, return a writable copy instead of a read-only view
             
         Returns:
         --------
-        list of float
-            List of frequencies, or empty list if not found
+        np.ndarray
+            Read-only view of the frequencies, or an empty array if not found
             
         Examples:
         ---------
         freqs = data.get_freq('CO2', reference='Ara')
         """
-        result = self.get(species, reference, status)
+        rows = self._lookup(species, reference, status)
+        
+        if len(rows) == 0:
+            freqs = self._freq_values[:0]
+        else:
+            start, stop = self._freq_offsets[rows[0]], self._freq_offsets[rows[0] + 1]
+            freqs = self._freq_values[start:stop]
         
-        if len(result) == 0:
-            return []
+        return freqs.copy() if copy else freqs
+    
+    def get_freqs(self, keys: List[Union[str, tuple]], copy: bool = False) -> List[np.ndarray]:
+        """
+        Get frequency arrays for many species in one call.
         
-        return result.iloc[0]['frequencies']
+        Parameters:
+        -----------
+        keys : list of str or tuple
+            Species names or (species, reference, status) tuples; trailing
+            fields may be omitted or None
+        copy : bool
+            If True, return writable copies instead of read-only views
+            
+        Returns:
+        --------
+        list of np.ndarray
+            Frequencies of the first match for each key (empty if not found)
+            
+        Examples:
+        ---------
+        co2, h2o = data.get_freqs([('CO2', 'Ara'), ('H2O', 'Ara', 'gas')])
+        """
+        results = []
+        for key in keys:
+            if isinstance(key, str):
+                key = (key,)
+            results.append(self.get_freq(*key, copy=copy))
+        return results
     
     def filter(self, reference: Optional[str] = None, 
                status: Optional[str] = None,
-               species_list: Optional[List[str]] = None) -> pd.DataFrame:
+               species_list: Optional[List[str]] = None,
+               copy: bool = False) -> pd.DataFrame:
         """
         Filter data by reference, status, or species list.
         
@@ -141,6 +304,8 @@ class FrequencyData:
             Status ('gas' or 'ads')
         species_list : list of str, optional
             List of species names to include
+        copy : bool
+            If True, frequencies are writable copies instead of read-only views
             
         Returns:
         --------
@@ -154,26 +319,22 @@ class FrequencyData:
         data.filter(reference='Ara', status='gas')
         data.filter(species_list=['CO2', 'H2O', 'CH4'])
         """
-        mask = pd.Series([True] * len(self.df), index=self.df.index)
-        
-        if reference is not None:
-            mask &= self.df['reference'] == reference
+        if species_list is None:
+            rows = self._lookup(None, reference, status)
+        else:
+            rows = np.unique(np.concatenate(
+                [self._no_rows] + [self._lookup(s, reference, status) for s in set(species_list)]
+            ))
         
-        if status is not None:
-            mask &= self.df['status'] == status
-        
-        if species_list is not None:
-            mask &= self.df['species_name'].isin(species_list)
-        
-        return self.df[mask].copy()
+        return self._select(rows, copy)
     
-    def get_gas(self, reference: Optional[str] = None) -> pd.DataFrame:
+    def get_gas(self, reference: Optional[str] = None, copy: bool = False) -> pd.DataFrame:
         """Get all gas phase species."""
-        return self.filter(status='gas', reference=reference)
+        return self.filter(status='gas', reference=reference, copy=copy)
     
-    def get_ads(self, reference: Optional[str] = None) -> pd.DataFrame:
+    def get_ads(self, reference: Optional[str] = None, copy: bool = False) -> pd.DataFrame:
         """Get all adsorbed species."""
-        return self.filter(status='ads', reference=reference)
+        return self.filter(status='ads', reference=reference, copy=copy)
     
     def search(self, pattern: str, column: str = 'species_name') -> pd.DataFrame:
         """
@@ -20,35 +20,142 @@ Usage:
     # Load and cache multiple datasets
     beef_df = load_data('BEEF-vdW')
     # other_df = load_data('other-functional')
+    
+    # Read-only access without copying the data
+    df = load_data('BEEF-vdW', copy=False)
+
+Computed tables are also cached on disk in data/.cache, keyed on the content
+hash of the source file, the calculator version and the calculator source
+(tools/formation_energy.py, tools/formula.py), so new processes skip the
+formation energy calculation entirely.
 """
 
+import numpy as np
 import pandas as pd
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Dict, Union
+import hashlib
+import pickle
 import sys
+import warnings
 
 # Add parent directory to path to import formation_energy module
 parent_dir = Path(__file__).parent.parent
 if str(parent_dir) not in sys.path:
     sys.path.insert(0, str(parent_dir))
 
+from tools import __version__ as CALCULATOR_VERSION
+from tools import formation_energy as _formation_energy_module
+from tools import formula as _formula_module
 from tools.formation_energy import FormationEnergyCalculator
 
 # Cache for loaded datasets to avoid recalculation
 _DATA_CACHE: Dict[str, pd.DataFrame] = {}
+_REF_CACHE: Dict[str, Dict[str, float]] = {}
 
 # Path to data directory
 DATA_DIR = Path(__file__).parent
 
+# Persistent cache of computed formation energy tables
+CACHE_DIR = DATA_DIR / '.cache'
+
+
+def _file_hash(filepath: Path) -> str:
+    """Return the SHA-256 hash of a file's contents."""
+    h = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _calculator_hash() -> str:
+    """SHA-256 of the calculator source, so edits invalidate the cache without a version bump."""
+    h = hashlib.sha256()
+    for module in (_formation_energy_module, _formula_module):
+        h.update(Path(module.__file__).read_bytes())
+    return h.hexdigest()
+
+
+def _cache_path(dataset_name: str, filepath: Path) -> Path:
+    """Persistent cache file for a dataset, keyed on content hash, calculator source and version."""
+    key = hashlib.sha256((_file_hash(filepath) + _calculator_hash()).encode()).hexdigest()
+    return CACHE_DIR / f"{dataset_name}-{key[:16]}-v{CALCULATOR_VERSION}.pkl"
+
+
+def _read_only(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rebuild df with its NumPy columns as read-only arrays (public API only;
+    extension-typed columns such as strings are kept as they are).
+    """
+    columns = {}
+    for k, (_, series) in enumerate(df.items()):
+        if isinstance(series.dtype, np.dtype) and series.dtype != object:
+            values = series.to_numpy(copy=True)
+            values.setflags(write=False)
+            columns[k] = values
+        else:
+            columns[k] = series.array
+    frozen = pd.DataFrame(columns, index=df.index, copy=False)
+    frozen.columns = df.columns
+    return frozen
+
+
+def _view(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shallow copy of a cached table: no data is copied, and writes to it either
+    copy the column first (copy-on-write) or fail on the read-only arrays,
+    so the cached table cannot be changed through it.
+    """
+    return df.copy(deep=False)
+
+
+def _read_persistent_cache(cache_path: Path) -> Optional[dict]:
+    """Read a cached table, or return None if it is missing or unreadable."""
+    if not cache_path.exists():
+        return None
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except Exception as e:
+        warnings.warn(f"Could not read cache {cache_path}: {e}")
+        return None
+
+
+def _write_persistent_cache(cache_path: Path, entry: dict):
+    """Write a computed table to the persistent cache, replacing stale versions."""
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        dataset_name = cache_path.name.rsplit('-', 2)[0]
+        for stale in CACHE_DIR.glob(f"{dataset_name}-*.pkl"):
+            if stale.name.rsplit('-', 2)[0] == dataset_name:
+                stale.unlink()
+        
+        # Write to a temporary file first so readers never see a partial cache
+        tmp_path = cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(cache_path)
+    except OSError as e:
+        warnings.warn(f"Could not write cache {cache_path}: {e}")
+
 
-def load_data(dataset_name: str, force_reload: bool = False) -> pd.DataFrame:
+def load_data(dataset_name: str, force_reload: bool = False, copy: bool = True) -> pd.DataFrame:
     """
     Load energy data from a TSV file and calculate formation energies.
     
+    Results are cached in memory and on disk (data/.cache). The disk cache is
+    keyed on the content hash of the TSV file, the calculator source and the
+    calculator version, so it is invalidated automatically when any changes.
+    
     Args:
         dataset_name: Name of the dataset (e.g., 'BEEF-vdW', 'PBE', etc.)
                      The function will look for '{dataset_name}.tsv' in the data directory
-        force_reload: If True, reload data even if cached (default: False)
+        force_reload: If True, recalculate even if cached (default: False)
+        copy: If False, return a read-only view of the cached DataFrame
+              without copying the data (default: True)
     
     Returns:
         DataFrame with all energy data including calculated formation energies
@@ -61,7 +168,8 @@ def load_data(dataset_name: str, force_reload: bool = False) -> pd.DataFrame:
     # Check cache first
     if not force_reload and dataset_name in _DATA_CACHE:
         #print(f"Loading {dataset_name} from cache...")
-        return _DATA_CACHE[dataset_name].copy()
+        df = _DATA_CACHE[dataset_name]
+        return df.copy() if copy else _view(df)
     
     # Construct file path
     filepath = DATA_DIR / f"{dataset_name}.tsv"
@@ -73,18 +181,27 @@ def load_data(dataset_name: str, force_reload: bool = False) -> pd.DataFrame:
             f"Available datasets: {list_available_datasets()}"
         )
     
-    print(f"Loading {dataset_name} from {filepath}...")
-    
-    # Load and calculate formation energies
-    calc = FormationEnergyCalculator(str(filepath))
-    calc.calculate_formation_energies()
+    cache_path = _cache_path(dataset_name, filepath)
+    entry = None if force_reload else _read_persistent_cache(cache_path)
+    
+    if entry is None:
+        print(f"Loading {dataset_name} from {filepath}...")
+        
+        # Load and calculate formation energies
+        calc = FormationEnergyCalculator(str(filepath))
+        calc.calculate_formation_energies()
+        
+        entry = {'df': calc.to_db(), 'ref_energies': calc.ref_energies.copy()}
+        _write_persistent_cache(cache_path, entry)
+        
+        print(f"✓ {dataset_name} loaded successfully ({len(entry['df'])} entries)")
     
     # Cache the result
-    _DATA_CACHE[dataset_name] = calc.to_db()
+    _DATA_CACHE[dataset_name] = _read_only(entry['df'])
+    _REF_CACHE[dataset_name] = entry['ref_energies']
     
-    print(f"✓ {dataset_name} loaded successfully ({len(_DATA_CACHE[dataset_name])} entries)")
-    
-    return _DATA_CACHE[dataset_name].copy()
+    df = _DATA_CACHE[dataset_name]
+    return df.copy() if copy else _view(df)
 
 
 def get_formation_energy(
@@ -109,7 +226,7 @@ def get_formation_energy(
         >>> energy = get_formation_energy('BEEF-vdW', 'CH4')
         >>> print(f"Formation energy of CH4: {energy:.4f} eV")
     """
-    df = load_data(dataset_name)
+    df = load_data(dataset_name, copy=False)
     
     # Filter by species name
     filtered = df[df['species_name'] == species_name]
@@ -154,7 +271,7 @@ def get_species_data(
         >>> print(f"Raw energy: {data['raw_energy']:.4f} eV")
         >>> print(f"Formation energy: {data['formation_energy']:.4f} eV")
     """
-    df = load_data(dataset_name)
+    df = load_data(dataset_name, copy=False)
     
     # Filter by species name
     filtered = df[df['species_name'] == species_name]
@@ -191,7 +308,7 @@ def get_species_list(dataset_name: str, phase_type: Optional[str] = None) -> lis
         >>> gas_species = get_species_list('BEEF-vdW', 'gas')
         >>> print(f"Gas phase species: {', '.join(gas_species)}")
     """
-    df = load_data(dataset_name)
+    df = load_data(dataset_name, copy=False)
     
     if phase_type is not None:
         df = df[df['type'].str.lower() == phase_type.lower()]
@@ -229,7 +346,7 @@ def filter_by_type(dataset_name: str, phase_type: str) -> pd.DataFrame:
         >>> gas_df = filter_by_type('BEEF-vdW', 'gas')
         >>> print(f"Found {len(gas_df)} gas phase species")
     """
-    df = load_data(dataset_name)
+    df = load_data(dataset_name, copy=False)
     return df[df['type'].str.lower() == phase_type.lower()].copy()
 
 
@@ -249,22 +366,20 @@ def get_reference_energies(dataset_name: str) -> Dict[str, float]:
         >>> print(f"O reference: {refs['O']:.4f} eV")
         >>> print(f"C reference: {refs['C']:.4f} eV")
     """
-    # Load data to ensure calculator is initialized
-    load_data(dataset_name)
+    # Load data to ensure reference energies are cached
+    load_data(dataset_name, copy=False)
     
-    # Create a fresh calculator to get reference energies
-    filepath = DATA_DIR / f"{dataset_name}.tsv"
-    calc = FormationEnergyCalculator(str(filepath))
-    calc.calculate_formation_energies()
-    
-    return calc.ref_energies.copy()
+    return _REF_CACHE[dataset_name].copy()
 
 
-def clear_cache():
+def clear_cache(persistent: bool = False):
     """
     Clear the data cache to free memory.
     Use this if you've loaded large datasets and want to free up memory.
     
+    Args:
+        persistent: If True, also delete the on-disk cache in data/.cache
+    
     Example:
         >>> load_data('BEEF-vdW')
         >>> # ... do some work ...
@@ -272,6 +387,10 @@ def clear_cache():
     """
     global _DATA_CACHE
     _DATA_CACHE.clear()
+    _REF_CACHE.clear()
+    if persistent and CACHE_DIR.exists():
+        for cache_file in CACHE_DIR.glob("*.pkl"):
+            cache_file.unlink()
     print("Data cache cleared")
 
 
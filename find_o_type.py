@@ -2,6 +2,11 @@
 Ara Cho, Mar, 2023 @SUNCAT
 description: distinguish the OOH, OH and O atoms in the input file.
 usage: python3 find_o_type.py [filename]
+       python3 find_o_type.py [filename] -s              (ask for a z cutoff)
+       python3 find_o_type.py [trajectory] -t [stride]   (per-frame counts -> o_type_counts.csv)
+O-O (< 1.6 Å) and O-H (< 1.2 Å) neighbours come from a cell-list search
+(neighbors.py, shared with hbond.py) under periodic boundary conditions instead of
+pairwise get_distance calls.
 
 Output: print following table 
 O_type  O1_idx  H1_idx H2_idx O2_idx  d(O1-H1)(Å) d(O1-H2)(Å) d(O1-O2)(Å)
@@ -19,151 +24,218 @@ from ase.io import read
 import os
 import numpy as np
 import sys
-import subprocess
 
-cutoff=0
-if len(sys.argv)==2:
-    if sys.argv[1] == '-h':
-        print("Usage: python3 find_o_type.py [input_file] [-s]")
+from layer_grouping import find_layers, print_layers
+from neighbors import get_neighbor_list
+
+O_O_CUTOFF = 1.6  # Å
+O_H_CUTOFF = 1.2  # Å
+
+
+def find_neighbors(atoms, o_index, h_index):
+    """
+    O and H neighbours of every O in o_index (minimum image), sorted by index.
+
+    Returns:
+        dict {O index: ([(O index, d), ...], [(H index, d), ...])}
+    """
+    o_index = np.asarray(o_index, dtype=int)
+    h_index = np.asarray(h_index, dtype=int)
+    neighbors = {int(i): ([], []) for i in o_index}
+    if len(o_index) == 0:
+        return neighbors
+    nl = get_neighbor_list(atoms, max(O_O_CUTOFF, O_H_CUTOFF))
+    # pairs come sorted by i then j, nearest image only: same order as looping over o_index / h_index
+    for kind, (element, cutoff, allowed) in enumerate([('O', O_O_CUTOFF, o_index), ('H', O_H_CUTOFF, h_index)]):
+        i, j, d, _ = nl.pairs('O', element, cutoff)
+        keep = np.isin(i, o_index) & np.isin(j, allowed)
+        for a, b, dist in zip(i[keep].tolist(), j[keep].tolist(), d[keep].tolist()):
+            neighbors[a][kind].append((b, dist))
+    return neighbors
+
+
+def classify_oxygens(atoms, cutoff=0):
+    """One row per O: O, OH, H2O, H3O, OOH or O2 with neighbour indices and distances."""
+    if cutoff == 0:
+        o_index = [atom.index for atom in atoms if atom.symbol=='O']
+        h_index = [atom.index for atom in atoms if atom.symbol=='H']
     else:
+        # plain per-atom z test, as before; -s lists the layers so the cutoff can be put in a gap
+        o_index = [atom.index for atom in atoms if atom.symbol=='O' and atom.z < cutoff]
+        h_index = [atom.index for atom in atoms if atom.symbol=='H' and atom.z < cutoff]
+
+    all_neighbors = find_neighbors(atoms, o_index, h_index)
+    data = []
+
+    for i in o_index:
+        row = {}
+        neighbors, h_neighbors = all_neighbors[i]
+
+        row['O1_idx'] = i
+
+        if len(neighbors) == 0 and len(h_neighbors) == 0:
+            row['O_type'] = 'O'
+        elif len(neighbors) == 1 and len(h_neighbors) == 1:
+            o_neighbor, o_d = neighbors[0]
+            h_neighbor, h_d = h_neighbors[0]
+            row.update({'O_type': 'OOH', 'H1_idx': int(h_neighbor), 'd(O1-H1)(Å)': h_d, 'O2_idx': int(o_neighbor), 'd(O1-O2)(Å)': o_d})
+        elif len(neighbors) == 0 and len(h_neighbors) == 1:
+            h_neighbor, h_d = h_neighbors[0]
+            row.update({'O_type': 'OH', 'H1_idx': int(h_neighbor), 'd(O1-H1)(Å)': h_d})
+        elif len(neighbors) == 0 and len(h_neighbors) == 2:
+            h1_neighbor, h1_d = h_neighbors[0]
+            h2_neighbor, h2_d = h_neighbors[1]
+            row.update({'O_type': 'H2O', 'H1_idx': int(h1_neighbor), 'd(O1-H1)(Å)': h1_d, 'H2_idx': int(h2_neighbor), 'd(O1-H2)(Å)': h2_d})
+        elif len(neighbors) == 0 and len(h_neighbors) == 3:
+            h1_neighbor, h1_d = h_neighbors[0]
+            h2_neighbor, h2_d = h_neighbors[1]
+            h3_neighbor, h3_d = h_neighbors[2]
+            row.update({'O_type': 'H3O', 'H1_idx': int(h1_neighbor), 'd(O1-H1)(Å)': h1_d, 'H2_idx': int(h2_neighbor), 'd(O1-H2)(Å)': h2_d, 'H3_idx': int(h3_neighbor), 'd(O1-H3)(Å)': h3_d})
+        elif len(neighbors) == 1 and len(h_neighbors) == 0:
+            o_neighbor, o_d = neighbors[0]
+            row.update({'O_type': 'O2', 'O2_idx': int(o_neighbor), 'd(O1-O2)(Å)': o_d})
+
+        data.append(row)
+    return data
+
+
+O_TYPES = ['O', 'OH', 'H2O', 'H3O', 'OOH', 'O2']
+
+
+def count_o_types(data):
+    """Number of each O type, counting O2 molecules once and not inside OOH (as in o_type.csv)."""
+    counts = dict.fromkeys(O_TYPES, 0)
+    ooh_atoms = set()
+    o2_pairs = set()
+    for row in data:
+        o_type = row.get('O_type')
+        if o_type == 'OOH':
+            ooh_atoms.update((row['O1_idx'], row['O2_idx']))
+        if o_type == 'O2':
+            o2_pairs.add(tuple(sorted((row['O1_idx'], row['O2_idx']))))
+        elif o_type is not None:
+            counts[o_type] += 1
+    counts['O2'] = sum(1 for pair in o2_pairs if not ooh_atoms.intersection(pair))
+    return counts
+
+
+def o_type_table(data):
+    """The o_type.csv table from classify_oxygens rows."""
+    df = pd.DataFrame(data)
+    if 'H3_idx' not in df.columns:
+        new_order = ['O_type', 'O1_idx', 'H1_idx', 'H2_idx', 'O2_idx', 'd(O1-H1)(Å)', 'd(O1-H2)(Å)', 'd(O1-O2)(Å)']
+    elif 'O2_idx' not in df.columns:
+        new_order = ['O_type', 'O1_idx', 'H1_idx', 'H2_idx', 'H3_idx', 'd(O1-H1)(Å)', 'd(O1-H2)(Å)', 'd(O1-H3)(Å)']
+    elif 'H3_idx' not in df.columns and 'O2_idx' not in df.columns:
+        new_order = ['O_type', 'O1_idx', 'H1_idx', 'H2_idx', 'd(O1-H1)(Å)', 'd(O1-H2)(Å)']
+    else:
+        new_order = ['O_type', 'O1_idx', 'H1_idx', 'H2_idx', 'O2_idx', 'H3_idx', 'd(O1-H1)(Å)', 'd(O1-H2)(Å)', 'd(O1-H3)(Å)', 'd(O1-O2)(Å)']
+    df = df.reindex(columns=new_order)
+    df = df.dropna(subset=['O_type'])
+
+
+    # df = df.drop(columns=['O_idxs'])
+
+    pd.set_option('display.expand_frame_repr', False)
+    pd.set_option('display.max_columns', None)
+    pd.set_option('display.max_colwidth', None)
+    pd.set_option('display.max_rows', None)
+
+    idx_cols = [col for col in df.columns if 'idx' in col]
+    dist_cols = [col for col in df.columns if 'd(' in col]
+
+    # remove the rows when O_type is O2, [O1_idx, O2_idx] are duplicated
+
+    df = df.dropna(subset=['O_type'])
+    df = df.replace('', float('nan'))
+    df = df.fillna(0)
+
+    if 'O2' in df['O_type'].unique():
+        o2_df = df[df['O_type'] == 'O2'].copy()
+        o2_df[['O1_idx', 'O2_idx']] = np.sort(o2_df[['O1_idx', 'O2_idx']], axis=1)
+        df.loc[df['O_type'] == 'O2', ['O1_idx', 'O2_idx']] = o2_df[['O1_idx', 'O2_idx']]
+
+        o2_df = o2_df.drop_duplicates(subset=['O1_idx', 'O2_idx'], keep='first')
+        df = pd.concat([df[df['O_type'] != 'O2'], o2_df])
+
+    # remove the rows when O_type is O2, [O1_ids or O2_idx] are included in OOH already.
+
+    ooh_df = df[df['O_type'] == 'OOH']
+    o2_df = df[df['O_type'] == 'O2']
+
+    o2_to_remove = []
+    for idx, row in o2_df.iterrows():
+        o1, o2 = row['O1_idx'], row['O2_idx']
+        if o1 in ooh_df['O1_idx'].values or o1 in ooh_df['O2_idx'].values or \
+           o2 in ooh_df['O1_idx'].values or o2 in ooh_df['O2_idx'].values:
+            o2_to_remove.append(idx)
+
+    df = df.drop(index=o2_to_remove).reset_index(drop=True)
+
+
+    for col in idx_cols:
+        df[col] = df[col].astype(int)
+        df[col] = df[col].replace({0: ''})
+
+    for col in dist_cols:
+        df[col] = df[col].round(3)
+
+    for col in dist_cols:
+        if df[col].notna().all():
+            df[col] = df[col].replace({0: '', 0.000: ''})
+    return df
+
+
+if __name__ == '__main__':
+    cutoff=0
+    trajectory=False
+    stride=1
+    if len(sys.argv)==2:
+        if sys.argv[1] == '-h':
+            print("Usage: python3 find_o_type.py [input_file] [-s | -t [stride]]")
+            exit()
+        else:
+            input_file=sys.argv[1]
+    elif len(sys.argv) in (3, 4):
         input_file=sys.argv[1]
-elif len(sys.argv)==3:
-    input_file=sys.argv[1]
-    if not os.path.exists(input_file):
-        print("{} is not exists".format(input_file))
-        exit()
-    if sys.argv[2] == '-s':
-        subprocess.call('python ~/bin/for_a_happy_life/layer_grouping.py -i {}'.format(input_file), shell=True)
-        print("")
-        cutoff_in=input('please enter a cutoff value for a z direction: ')
-        cutoff=float(cutoff_in)
-else:
-    if os.path.exists('final_with_calculator.json'):
-        input_file='final_with_calculator.json'
+        if not os.path.exists(input_file):
+            print("{} is not exists".format(input_file))
+            exit()
+        if sys.argv[2] == '-s':
+            print_layers(find_layers(read(input_file), exclude=['Pt']))
+            print("")
+            cutoff_in=input('please enter a cutoff value for a z direction: ')
+            cutoff=float(cutoff_in)
+        elif sys.argv[2] == '-t':
+            trajectory=True
+            if len(sys.argv) == 4:
+                stride=int(sys.argv[3])
     else:
-        print(sys.argv)
-        print("Usage: python3 find_o_type.py [input_file]")
+        if os.path.exists('final_with_calculator.json'):
+            input_file='final_with_calculator.json'
+        else:
+            print(sys.argv)
+            print("Usage: python3 find_o_type.py [input_file]")
+            exit()
+    print("Input file: ", input_file)   
+
+    if trajectory:
+        from trajstore import iter_frames
+        rows = []
+        for n, atoms in enumerate(iter_frames(input_file, stride)):
+            counts = count_o_types(classify_oxygens(atoms, cutoff))
+            rows.append({'frame': n * stride, **counts})
+        counts_df = pd.DataFrame(rows, columns=['frame'] + O_TYPES)
+        print(counts_df.describe().loc[['mean', 'min', 'max']].round(2).to_string())
+        counts_df.to_csv('o_type_counts.csv', index=False)
+        print(f"{len(counts_df)} frames written to o_type_counts.csv")
         exit()
-print("Input file: ", input_file)   
-
-
-atoms=read(input_file)
-
-
-if cutoff == 0:
-    o_index = [atom.index for atom in atoms if atom.symbol=='O']
-    h_index = [atom.index for atom in atoms if atom.symbol=='H']
-else:
-    print("Cutoff: ", cutoff)
-    o_index = [atom.index for atom in atoms if atom.symbol=='O' and atom.z < cutoff]
-    h_index = [atom.index for atom in atoms if atom.symbol=='H' and atom.z < cutoff]
-
-data = []
-
-for i in o_index:
-    row = {}
-    neighbors = []
-    h_neighbors = []
-    for j in o_index:
-        if i != j:
-            d = atoms.get_distance(i, j, mic=True)
-            if d < 1.6:
-                neighbors.append((j, d))
-    for j in h_index:
-        d = atoms.get_distance(i, j, mic=True)
-        if d < 1.2:
-            h_neighbors.append((j, d))
-
-    row['O1_idx'] = i
-
-    if len(neighbors) == 0 and len(h_neighbors) == 0:
-        row['O_type'] = 'O'
-    elif len(neighbors) == 1 and len(h_neighbors) == 1:
-        o_neighbor, o_d = neighbors[0]
-        h_neighbor, h_d = h_neighbors[0]
-        row.update({'O_type': 'OOH', 'H1_idx': int(h_neighbor), 'd(O1-H1)(Å)': h_d, 'O2_idx': int(o_neighbor), 'd(O1-O2)(Å)': o_d})
-    elif len(neighbors) == 0 and len(h_neighbors) == 1:
-        h_neighbor, h_d = h_neighbors[0]
-        row.update({'O_type': 'OH', 'H1_idx': int(h_neighbor), 'd(O1-H1)(Å)': h_d})
-    elif len(neighbors) == 0 and len(h_neighbors) == 2:
-        h1_neighbor, h1_d = h_neighbors[0]
-        h2_neighbor, h2_d = h_neighbors[1]
-        row.update({'O_type': 'H2O', 'H1_idx': int(h1_neighbor), 'd(O1-H1)(Å)': h1_d, 'H2_idx': int(h2_neighbor), 'd(O1-H2)(Å)': h2_d})
-    elif len(neighbors) == 0 and len(h_neighbors) == 3:
-        h1_neighbor, h1_d = h_neighbors[0]
-        h2_neighbor, h2_d = h_neighbors[1]
-        h3_neighbor, h3_d = h_neighbors[2]
-        row.update({'O_type': 'H3O', 'H1_idx': int(h1_neighbor), 'd(O1-H1)(Å)': h1_d, 'H2_idx': int(h2_neighbor), 'd(O1-H2)(Å)': h2_d, 'H3_idx': int(h3_neighbor), 'd(O1-H3)(Å)': h3_d})
-    elif len(neighbors) == 1 and len(h_neighbors) == 0:
-        o_neighbor, o_d = neighbors[0]
-        row.update({'O_type': 'O2', 'O2_idx': int(o_neighbor), 'd(O1-O2)(Å)': o_d})
-
-    data.append(row)
-
-df = pd.DataFrame(data)
-if 'H3_idx' not in df.columns:
-    new_order = ['O_type', 'O1_idx', 'H1_idx', 'H2_idx', 'O2_idx', 'd(O1-H1)(Å)', 'd(O1-H2)(Å)', 'd(O1-O2)(Å)']
-elif 'O2_idx' not in df.columns:
-    new_order = ['O_type', 'O1_idx', 'H1_idx', 'H2_idx', 'H3_idx', 'd(O1-H1)(Å)', 'd(O1-H2)(Å)', 'd(O1-H3)(Å)']
-elif 'H3_idx' not in df.columns and 'O2_idx' not in df.columns:
-    new_order = ['O_type', 'O1_idx', 'H1_idx', 'H2_idx', 'd(O1-H1)(Å)', 'd(O1-H2)(Å)']
-else:
-    new_order = ['O_type', 'O1_idx', 'H1_idx', 'H2_idx', 'O2_idx', 'H3_idx', 'd(O1-H1)(Å)', 'd(O1-H2)(Å)', 'd(O1-H3)(Å)', 'd(O1-O2)(Å)']
-df = df.reindex(columns=new_order)
-df = df.dropna(subset=['O_type'])
-
-
-# df = df.drop(columns=['O_idxs'])
-
-pd.set_option('display.expand_frame_repr', False)
-pd.set_option('display.max_columns', None)
-pd.set_option('display.max_colwidth', None)
-pd.set_option('display.max_rows', None)
-
-idx_cols = [col for col in df.columns if 'idx' in col]
-dist_cols = [col for col in df.columns if 'd(' in col]
-
-# remove the rows when O_type is O2, [O1_idx, O2_idx] are duplicated
-
-df = df.dropna(subset=['O_type'])
-df = df.replace('', float('nan'))
-df = df.fillna(0)
-
-if 'O2' in df['O_type'].unique():
-    o2_df = df[df['O_type'] == 'O2'].copy()
-    o2_df[['O1_idx', 'O2_idx']] = np.sort(o2_df[['O1_idx', 'O2_idx']], axis=1)
-    df.loc[df['O_type'] == 'O2', ['O1_idx', 'O2_idx']] = o2_df[['O1_idx', 'O2_idx']]
-
-    o2_df = o2_df.drop_duplicates(subset=['O1_idx', 'O2_idx'], keep='first')
-    df = pd.concat([df[df['O_type'] != 'O2'], o2_df])
-
-# remove the rows when O_type is O2, [O1_ids or O2_idx] are included in OOH already.
-
-ooh_df = df[df['O_type'] == 'OOH']
-o2_df = df[df['O_type'] == 'O2']
-
-o2_to_remove = []
-for idx, row in o2_df.iterrows():
-    o1, o2 = row['O1_idx'], row['O2_idx']
-    if o1 in ooh_df['O1_idx'].values or o1 in ooh_df['O2_idx'].values or \
-       o2 in ooh_df['O1_idx'].values or o2 in ooh_df['O2_idx'].values:
-        o2_to_remove.append(idx)
-
-df = df.drop(index=o2_to_remove).reset_index(drop=True)
-
-
-for col in idx_cols:
-    df[col] = df[col].astype(int)
-    df[col] = df[col].replace({0: ''})
-
-for col in dist_cols:
-    df[col] = df[col].round(3)
-
-for col in dist_cols:
-    if df[col].notna().all():
-        df[col] = df[col].replace({0: '', 0.000: ''})
-
-
-print(df.to_string(index=False))
-df.to_csv('o_type.csv', index=False)
-#print('Data saved to o_type.csv')
+
+    atoms=read(input_file)
+    if cutoff:
+        print("Cutoff: ", cutoff)
+    df = o_type_table(classify_oxygens(atoms, cutoff))
+
+    print(df.to_string(index=False))
+    df.to_csv('o_type.csv', index=False)
+    #print('Data saved to o_type.csv')
@@ -5,6 +5,8 @@ usage: python fixatom.py -i [filename] -f "element" -r "index" -d [distance]
 i.g) python fixatom.py -i POSCAR -f "Pt" # fix all Pt atoms
     python fixatom.py -i POSCAR -r "41,42" # fix all except 41,42
     python fixatom.py -i POSCAR -d 10.0 # fix all atoms below 10.0 Angstrom
+    python fixatom.py -i POSCAR -d 10.0 --layers # fix whole layers whose mean z is below 10.0 Angstrom
+    (--layers groups atoms along z with --tol, see layer_grouping.py, so a layer is never split)
 """
 
 
@@ -13,11 +15,15 @@ from ase.io import read, write
 from ase.constraints import FixAtoms, FixedPlane
 import argparse
 
+from layer_grouping import atoms_below, Z_TOL
+
 parser = argparse.ArgumentParser()
 parser.add_argument('-i', '--input', help='input file', default='final_with_calculator.json')
 parser.add_argument('-f', '--fix', help='element to fix', type=str)
 parser.add_argument('-r', '--relax', help='index to relax; others will be fixed', type=str)
 parser.add_argument('-d', '--distance', help='all atoms will be fixed below distance', type=float)
+parser.add_argument('--layers', help='with -d, fix whole layers whose mean z is below distance', action='store_true')
+parser.add_argument('--tol', help='max z gap inside one layer for --layers (Å)', type=float, default=Z_TOL)
 args = parser.parse_args()
 
 if args.input:
@@ -46,7 +52,11 @@ if args.relax:
 if args.distance:
     print('fix atoms below distance:', args.distance)
     atoms=read(args.input)
-    fix_info = [atom.index for atom in atoms if atom.position[2]<args.distance]
+    if args.layers:
+        fix_info = atoms_below(atoms, args.distance, args.tol)
+        print('number of fixed atoms:', len(fix_info))
+    else:
+        fix_info = [atom.index for atom in atoms if atom.position[2]<args.distance]
     c=FixAtoms(indices=fix_info)
     atoms.set_constraint(c)
     write('restart.json',atoms)
@@ -2,13 +2,18 @@ import numpy as np
 import logging
 import os
 import sys
-import subprocess
-from ase.io import write, read
+from ase.io import write
 from ase import Atoms, Atom
 from ase.io.trajectory import Trajectory
 home=os.path.expanduser('~')
 sys.path.append(os.path.abspath(home+'/bin/for_a_happy_life'))
 from  bader_get_charge_vasp_py3_new  import *
+try:
+    from vasp.outcar import read_outcar_last_frame
+    from vasp.convergence import check_convergence, write_status
+except ImportError:
+    from outcar import read_outcar_last_frame
+    from convergence import check_convergence, write_status
 import logging.config
 # ================== Logger ================================
 def Logger(file_name):
@@ -37,17 +42,17 @@ if(len(sys.argv)>1):
     energy=atoms.get_potential_energy()
     forces=atoms.get_forces()
     logger.info(energy)    
-    subprocess.check_output("ase convert -f -n -1 %s  -o json moments.json " %(file), shell=True)
+    write('moments.json', atoms)
 else:
     logger.info('get energy from OUTCAR')
     file='OUTCAR'
-    energy=subprocess.check_output("grep py= OUTCAR | tail -1 | gawk '{print $7}' ", shell=True)
-    energy=float(energy)
+    # positions, forces, energy(sigma->0) and magmoms of the last ionic step in one pass
+    atoms=read_outcar_last_frame(file)
+    energy=atoms.get_potential_energy()
     logger.info(energy)
-    atoms=read(file)
     forces=atoms.get_forces()
-    subprocess.check_output("ase convert -f -n -1 OUTCAR -o json moments.json ", shell=True)
-    #subprocess.check_output("ase convert -f -n -1 OUTCAR -o cif moments.cif ", shell=True)
+    write('moments.json', atoms)
+    #write('moments.cif', atoms)
     logger.info('create moments.json')
     traj2=Trajectory('moments.traj',  'w')
     traj2.write(atoms, energy=energy)
@@ -86,8 +91,6 @@ if write_charge_traj:
     logger.info("set initial charges")
 write('restart.json', atoms)
 logger.info("write restart.json")
-sum=0.0
-largest=0.0
 for a in range(len(atoms)):
     if write_magmom:
         if(np.abs(moms[a])>0.1):
@@ -95,11 +98,10 @@ for a in range(len(atoms)):
         if(len(sys.argv)>2):
             if(atoms[a].symbol==element):
                 moments2.append(moms[a])
-for a in range(len(atoms)):
-    force=np.sqrt(forces[a][0]**2+forces[a][1]**2+forces[a][2]**2)
-    sum+=force
-    if(force>largest):
-        largest=force
+# fixed atoms (FixAtoms / selective dynamics) do not count
+result=check_convergence(forces, atoms)
+largest=result['max']
+sum=result['sum']
 
 if(len(sys.argv)>2):
     print (moments2)
@@ -111,11 +113,10 @@ else:
     logger.info(f'largest force {largest} {sum}')
     # print ('Forces')
     # print ('largest force ',largest,' ',sum)
-    if (largest < 0.03):
+    if result['converged']:
         logger.info('CONVERGED')
         # print ('CONVERGED')
-        subprocess.check_output("echo $PWD ' : CONVERGED with ENERGY %.6f' and MAX FORCE of %.3f > DONE " %(energy, largest), shell=True)
     else:
         logger.info('NOT CONVERGED')
         #print ('NOT CONVERGED')
-        subprocess.check_output("echo $PWD ' : CONVERGED with ENERGY %.6f' and MAX FORCE of %.3f > NOT_DONE " %(energy, largest), shell=True)
+    write_status(result, energy)
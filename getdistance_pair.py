@@ -11,69 +11,217 @@ Pairs            [42, 50]         [42, 41]
 02               1.001            2.117
 03               0.991            2.460
 04               0.985            2.603
+
+batch mode: several NEB pathways at once, table saved as csv (or tsv)
+$ python getdistance_pair.py -p 42,50 42,41 -d neb_OOH neb_OH -o distances.csv (-j 8)
+
+The structures of all numbered image folders (00, 01, ...) are read in a
+thread pool; for POSCAR/CONTCAR only the cell and positions are parsed.
+All pair distances of all images are then computed in one vectorized
+minimum-image operation (--no-mic for plain Cartesian distances).
+If an image has no (or an empty) CONTCAR, its POSCAR is used.
+
+trajectory mode: the same pairs in every frame of an XDATCAR, .traj or .npt store
+$ python getdistance_pair.py -p 42,50 42,41 -t XDATCAR (--stride 10) (-o distances.npz)
+Frames are streamed in chunks, so long runs are never loaded whole. The time
+series is saved column-wise: distances.npz (arrays frame, pairs, distances
+[n_frames x n_pairs], float32) or a csv/tsv with one column per pair.
 """
-import sys
+import itertools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from ase.io import read
-from ase import Atom
-from ase import Atoms
-from ase import neighborlist
 import argparse
 import numpy as np
-import math
-import time
-import random
-import os
 
-parser = argparse.ArgumentParser()
-parser.add_argument('-i', '--input', help='input file', default='CONTCAR')
-parser.add_argument('-p', '--pairs', help='Pairs separated by space (e.g., 1,2 1,3 ..)', type=str, nargs='+')
+from neighbors import batch_pair_distances
+from trajstore import iter_chunks
 
-args = parser.parse_args()
+FALLBACK = {'CONTCAR': 'POSCAR'}
 
-if args.input:
-    print('Your inputfile is:', args.input)
-    #atoms = read(args.input)
-else:
-    print('No inputfile is given. Default is CONTCAR')
 
-fol='.'
-dir_list = [name for name in os.listdir(fol) if os.path.isdir(name)]
-dir_list = [d for d in dir_list if d[-1].isdigit() and d[0].isdigit()]
-dir_list.sort()
-num_dir = len(dir_list)
-#print(dir_list)
+def image_dirs(root='.'):
+    """Numbered image folders (00, 01, ...) under root; [root] itself if there are none."""
+    dir_list = [name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name))]
+    dir_list = [d for d in dir_list if d[-1].isdigit() and d[0].isdigit()]
+    dir_list.sort()
+    if not dir_list:
+        return [root]
+    return [os.path.join(root, d) for d in dir_list]
 
 
-if args.pairs:
-    print('Your pair is:', args.pairs)
-    pairs = args.pairs
-    header = ['Pairs']
-    distances = []
-    for pair in pairs:
-        pair = pair.split(',')
-        pair = [int(i) for i in pair]
-        distance = 'Distance_'+str(pair[0])+'_'+str(pair[1])
-        distances.append(distance)
-        header.append(str(pair))
-    print('  '.join([h.ljust(15) for h in header]))
+def read_positions_cell(path):
+    """
+    (positions, cell, pbc) of the last structure in path.
 
-    if num_dir > 0:
-        for d in dir_list:
-            os.chdir(d)
-            atoms = read(args.input)
-            line=[d]
-            for pair in pairs:
-                pair = pair.split(',')
-                pair = [int(i) for i in pair]
-                distance = atoms.get_distance(pair[0], pair[1])
-                line.append(f'{distance:.3f}')
-            print('  '.join([str(l).ljust(15) for l in line]))
-            os.chdir('..')
+    POSCAR/CONTCAR are parsed directly: only the header and the coordinate
+    block are read (no velocities, constraints or Atoms object).
+    """
+    name = os.path.basename(path)
+    if 'POSCAR' not in name and 'CONTCAR' not in name:
+        atoms = read(path)
+        return atoms.positions, atoms.cell.array, atoms.pbc
+    with open(path) as f:
+        header = list(itertools.islice(f, 7))
+        scale = float(header[1].split()[0])
+        cell = np.array([line.split()[:3] for line in header[2:5]], dtype=float)
+        if scale < 0:
+            # negative scale is the cell volume
+            scale = (-scale / abs(np.linalg.det(cell))) ** (1.0 / 3.0)
+        cell *= scale
+        if header[5].split()[0].isdigit():
+            # VASP 4 format, no element line
+            counts, mode = header[5], header[6]
+        else:
+            counts, mode = header[6], next(f)
+        n_atoms = sum(int(n) for n in counts.split())
+        if mode.strip()[0] in 'sS':
+            mode = next(f)
+        block = list(itertools.islice(f, n_atoms))
+    if len(block) < n_atoms:
+        raise ValueError(f"{path}: expected {n_atoms} coordinate lines, found {len(block)}")
+    coords = np.array([line.split()[:3] for line in block], dtype=float)
+    if mode.strip()[0] in 'cCkK':
+        positions = coords * scale
     else:
-        line=['.']
-        for pair in pairs:
-            pair = pair.split(',')
-            pair = [int(i) for i in pair]
-            distance = atoms.get_distance(pair[0], pair[1])
-            line.append(f'{distance:.3f}')
+        positions = coords @ cell
+    return positions, cell, np.ones(3, dtype=bool)
+
+
+def image_file(directory, input_file):
+    """input_file in directory, or its fallback (CONTCAR -> POSCAR) when missing or empty."""
+    path = os.path.join(directory, input_file)
+    if (not os.path.isfile(path) or os.path.getsize(path) == 0) and input_file in FALLBACK:
+        fallback = os.path.join(directory, FALLBACK[input_file])
+        if os.path.isfile(fallback):
+            return fallback
+    return path
+
+
+def read_images(paths, workers=8):
+    """read_positions_cell for every path in a thread pool; None for files that cannot be read."""
+    def load(path):
+        try:
+            return read_positions_cell(path)
+        except (OSError, ValueError, IndexError, StopIteration) as error:
+            print(f"Skip {path}: {error}")
+            return None
+
+    if workers <= 1 or len(paths) <= 1:
+        return [load(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(load, paths))
+
+
+def distance_table(structures, pairs, mic=True):
+    """
+    (n_images, n_pairs) distances; rows of unreadable images are nan.
+
+    Images with the same number of atoms are stacked and computed together.
+    """
+    pairs = np.asarray(pairs, dtype=int).reshape(-1, 2)
+    table = np.full((len(structures), len(pairs)), np.nan)
+    groups = {}
+    for k, structure in enumerate(structures):
+        if structure is not None:
+            groups.setdefault(len(structure[0]), []).append(k)
+    for n_atoms, rows in groups.items():
+        if pairs.size and pairs.max() >= n_atoms:
+            print(f"Pair index out of range for {n_atoms} atoms; rows {rows} skipped")
+            continue
+        positions = np.stack([structures[k][0] for k in rows])
+        cells = np.stack([structures[k][1] for k in rows])
+        pbc = structures[rows[0]][2]
+        table[rows] = batch_pair_distances(positions, cells, pbc, pairs[:, 0], pairs[:, 1], mic)
+    return table
+
+
+def write_table(output, labels, header, table):
+    """Save the distance table as csv, or tsv when output ends with .tsv."""
+    sep = '\t' if output.endswith('.tsv') else ','
+    with open(output, 'w') as f:
+        f.write(sep.join(['image'] + header) + '\n')
+        for label, row in zip(labels, table):
+            f.write(sep.join([label] + ['' if np.isnan(x) else f'{x:.4f}' for x in row]) + '\n')
+
+
+def track_distances(path, pairs, stride=1, mic=True, chunk=1000):
+    """
+    Pair distances in every stride-th frame of a trajectory.
+
+    Frames are read chunk frames at a time and each chunk is one vectorized
+    batch_pair_distances call.
+
+    Returns:
+        frame numbers (n_frames,) and distances (n_frames, n_pairs) as float32
+    """
+    pairs = np.asarray(pairs, dtype=int).reshape(-1, 2)
+    blocks = []
+    for positions, cells, pbc in iter_chunks(path, stride, chunk):
+        blocks.append(batch_pair_distances(positions, cells, pbc, pairs[:, 0], pairs[:, 1], mic)
+                      .astype(np.float32))
+    distances = np.concatenate(blocks) if blocks else np.zeros((0, len(pairs)), dtype=np.float32)
+    return np.arange(len(distances)) * stride, distances
+
+
+def write_series(output, frames, pairs, distances):
+    """Save a distance time series as .npz (arrays frame, pairs, distances) or as csv/tsv columns."""
+    if output.endswith('.npz'):
+        np.savez(output, frame=frames, pairs=np.asarray(pairs, dtype=int), distances=distances)
+        return
+    sep = '\t' if output.endswith('.tsv') else ','
+    header = sep.join(['frame'] + [f'd_{i}_{j}' for i, j in pairs])
+    np.savetxt(output, np.column_stack([frames, distances]), fmt=['%d'] + ['%.4f'] * len(pairs),
+               delimiter=sep, header=header, comments='')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-i', '--input', help='input file', default='CONTCAR')
+    parser.add_argument('-p', '--pairs', help='Pairs separated by space (e.g., 1,2 1,3 ..)', type=str, nargs='+')
+    parser.add_argument('-d', '--dirs', help='pathway folders holding the numbered images', nargs='+', default=['.'])
+    parser.add_argument('-o', '--output', help='save the table as csv (or .tsv)', default=None)
+    parser.add_argument('-j', '--workers', help='number of reader threads', type=int, default=8)
+    parser.add_argument('--no-mic', help='plain distances without minimum image convention', action='store_true')
+    parser.add_argument('-t', '--traj', help='trajectory (XDATCAR, .traj, .npt): distances in every frame', default=None)
+    parser.add_argument('--stride', help='use every n-th frame (trajectory mode)', type=int, default=1)
+    args = parser.parse_args()
+
+    if not args.traj:
+        print('Your inputfile is:', args.input)
+    if not args.pairs:
+        parser.error('give the pairs with -p (e.g., -p 1,2 3,4)')
+    print('Your pair is:', args.pairs)
+    pairs = [[int(i) for i in pair.split(',')] for pair in args.pairs]
+
+    if args.traj:
+        output = args.output or 'distances.npz'
+        frames, distances = track_distances(args.traj, pairs, args.stride, mic=not args.no_mic)
+        write_series(output, frames, pairs, distances)
+        print('Pair'.ljust(15) + ''.join(s.ljust(10) for s in ('mean', 'min', 'max')))
+        for pair, column in zip(pairs, distances.T):
+            if len(column):
+                print(str(pair).ljust(15) + ''.join(f'{x:<10.3f}' for x in (column.mean(), column.min(), column.max())))
+        print(f'{len(frames)} frames written to {output}')
+        exit()
+
+    directories = []
+    labels = []
+    for root in args.dirs:
+        for d in image_dirs(root):
+            directories.append(d)
+            labels.append(os.path.relpath(d, '.') if len(args.dirs) > 1 else os.path.relpath(d, root))
+
+    structures = read_images([image_file(d, args.input) for d in directories], args.workers)
+    table = distance_table(structures, pairs, mic=not args.no_mic)
+
+    header = ['Pairs'] + [str(pair) for pair in pairs]
+    print('  '.join([h.ljust(15) for h in header]))
+    for label, row in zip(labels, table):
+        line = [label] + ['-' if np.isnan(x) else f'{x:.3f}' for x in row]
         print('  '.join([str(l).ljust(15) for l in line]))
+
+    if args.output:
+        write_table(args.output, labels, [f'd_{i}_{j}' for i, j in pairs], table)
+        print(f'{len(labels)} images written to {args.output}')
@@ -3,44 +3,153 @@ Ara Cho, Apr, 2023 @SUNCAT
 description: This script is used to find hydrogen bonds in a given structure.
 
 Usage: python3 hbond.py final_with_calculator.json
-O(36) -- H(47) : 2.060 Å
-O(37) -- H(48) : 2.038 Å
-O(39) -- H(44) : 1.625 Å
-O(39) -- H(45) : 1.688 Å
-O(40) -- H(41) : 1.602 Å
-O(40) -- H(46) : 1.695 Å
+O(36) -- H(47) : 2.060 Å  donor O(12) 165.3°
+O(37) -- H(48) : 2.038 Å  donor O(15) 158.1°
+O(39) -- H(44) : 1.625 Å  donor O(22) 171.0°
+
+Usage: python3 hbond.py aimd_sum.traj -t (--stride 10) (--dt 0.5)
+per-frame counts -> hbond_counts.csv, H-bond lifetimes -> hbond_lifetimes.csv
+(.traj, XDATCAR or a .npt trajectory store, streamed frame by frame)
+
+An H-bond is D-H...A with 1.2 < d(H...A) < 2.3 Å and angle D-H...A >= 120°,
+where the donor D is the O within 1.2 Å of H. All O-H pairs come from one
+cell-list neighbour search under periodic boundary conditions (neighbors.py,
+shared with find_o_type.py).
+Use --angle 0 to list every H...O pair in the distance window, as before.
 """
 
 from ase.io import read
-import sys
+import numpy as np
+import argparse
+import csv
+
+from neighbors import get_neighbor_list
+
+CUTOFF = 2.3      # Å, max H...A distance
+MIN_DIST = 1.2    # Å, min H...A distance (shorter is a covalent O-H bond)
+OH_BOND = 1.2     # Å, H belongs to the nearest O within this distance
+ANGLE = 120.0     # degrees, min D-H...A angle
+
+
+def find_hbonds(atoms, cutoff=CUTOFF, min_dist=MIN_DIST, angle=ANGLE, oh_bond=OH_BOND):
+    """
+    Hydrogen bonds of one structure, in a single vectorized pass.
+
+    Returns:
+        dict of arrays (one entry per H-bond, sorted by acceptor then H):
+        'acceptor', 'h', 'donor' (-1 if H has no O within oh_bond),
+        'distance' (H...A, Å) and 'angle' (D-H...A, degrees; nan without donor)
+    """
+    nl = get_neighbor_list(atoms, max(cutoff, oh_bond))
+    # i = H, j = O, D = vector H -> O (nearest periodic image)
+    i, j, d, D = nl.pairs('H', 'O', max(cutoff, oh_bond))
+
+    # donor of each H: nearest O within oh_bond
+    donor = np.full(len(atoms), -1)
+    donor_vec = np.full((len(atoms), 3), np.nan)
+    bonded = np.flatnonzero(d < oh_bond)
+    if len(bonded):
+        order = bonded[np.lexsort((d[bonded], i[bonded]))]
+        first = order[np.r_[True, i[order][1:] != i[order][:-1]]]
+        donor[i[first]] = j[first]
+        donor_vec[i[first]] = D[first]
+
+    candidate = (d > min_dist) & (d < cutoff) & (j != donor[i])
+    i, j, d, D = i[candidate], j[candidate], d[candidate], D[candidate]
+    v_hd = donor_vec[i]
+    cos = np.einsum('ij,ij->i', v_hd, D) / (np.linalg.norm(v_hd, axis=1) * d)
+    angles = np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+    if angle > 0:
+        keep = angles >= angle  # nan (no donor) fails the test
+        i, j, d, angles = i[keep], j[keep], d[keep], angles[keep]
+
+    order = np.lexsort((i, j))
+    return {
+        'acceptor': j[order],
+        'h': i[order],
+        'donor': donor[i[order]],
+        'distance': d[order],
+        'angle': angles[order],
+    }
+
+
+def track_hbonds(frames, stride=1, dt=None, counts_file='hbond_counts.csv',
+                 lifetimes_file='hbond_lifetimes.csv', **criteria):
+    """
+    Per-frame H-bond counts and continuous lifetimes over a trajectory.
+
+    A bond (donor, H, acceptor) lives from the first frame it appears until the
+    first analysed frame it is missing. Both files are written incrementally.
+
+    Returns:
+        (number of frames, list of lifetimes in frames)
+    """
+    active = {}
+    lifetimes = []
+    n = -1
+    with open(counts_file, 'w', newline='') as fc, open(lifetimes_file, 'w', newline='') as fl:
+        counts_writer = csv.writer(fc)
+        life_writer = csv.writer(fl)
+        counts_writer.writerow(['frame', 'n_hbonds', 'mean_distance', 'mean_angle'])
+        life_header = ['donor', 'h', 'acceptor', 'start_frame', 'n_frames']
+        if dt:
+            life_header.append('lifetime_fs')
+        life_writer.writerow(life_header)
+
+        def close(key, start, end):
+            length = (end - start) // stride
+            lifetimes.append(length)
+            row = [*key, start, length]
+            if dt:
+                row.append(length * stride * dt)
+            life_writer.writerow(row)
+
+        for n, atoms in enumerate(frames):
+            frame = n * stride
+            hb = find_hbonds(atoms, **criteria)
+            counts_writer.writerow([frame, len(hb['h']),
+                                    round(float(hb['distance'].mean()), 4) if len(hb['h']) else '',
+                                    round(float(np.nanmean(hb['angle'])), 2) if len(hb['h']) else ''])
+            current = set(zip(hb['donor'].tolist(), hb['h'].tolist(), hb['acceptor'].tolist()))
+            for key in list(active):
+                if key not in current:
+                    close(key, active.pop(key), frame)
+            for key in current:
+                active.setdefault(key, frame)
+        end = (n + 1) * stride
+        for key, start in active.items():
+            close(key, start, end)
+    return n + 1, lifetimes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='find hydrogen bonds in a structure or a trajectory')
+    parser.add_argument('input_file', nargs='?', default='final_with_calculator.json')
+    parser.add_argument('-t', '--traj', action='store_true', help='trajectory mode: counts and lifetimes per frame')
+    parser.add_argument('--stride', type=int, default=1, help='analyse every n-th frame (trajectory mode)')
+    parser.add_argument('--dt', type=float, default=None, help='time between frames in fs (trajectory mode)')
+    parser.add_argument('--cutoff', type=float, default=CUTOFF, help='max H...A distance (Å)')
+    parser.add_argument('--min', dest='min_dist', type=float, default=MIN_DIST, help='min H...A distance (Å)')
+    parser.add_argument('--angle', type=float, default=ANGLE, help='min D-H...A angle (degrees), 0 to disable')
+    args = parser.parse_args()
+    print("Input file: ", args.input_file)
+    criteria = dict(cutoff=args.cutoff, min_dist=args.min_dist, angle=args.angle)
 
-if len(sys.argv)==2:
-    if sys.argv[1] == '-h':
-        print("Usage: python3 hbond.py final_with_calculator.json")
+    if args.traj:
+        from trajstore import iter_frames
+        n_frames, lifetimes = track_hbonds(iter_frames(args.input_file, args.stride),
+                                           args.stride, args.dt, **criteria)
+        print(f"{n_frames} frames -> hbond_counts.csv, {len(lifetimes)} H-bonds -> hbond_lifetimes.csv")
+        if lifetimes:
+            mean = np.mean(lifetimes) * args.stride
+            unit = f"{mean * args.dt:.1f} fs" if args.dt else f"{mean:.1f} frames"
+            print(f"mean continuous lifetime: {unit}")
     else:
-        input_file=sys.argv[1]
-        print("Input file: ", input_file)
-else:
-    input_file='final_with_calculator.json'
-    print("Input file: ", input_file)
-    
-atoms = read(input_file)
-
-cutoff = 2.3
-
-# finding hydrogen and oxygen indices
-h_indices = [i for i, atom in enumerate(atoms) if atom.symbol == 'H']
-o_indices = [i for i, atom in enumerate(atoms) if atom.symbol == 'O']
-
-# get hydrogen bonds
-hbonds = []
-for j, o_index in enumerate(o_indices):
-    for i, h_index in enumerate(h_indices):
-        neighbor_distance = atoms.get_distance(h_index,o_index,mic=True)
-        if 1.2 < neighbor_distance < cutoff:
-            hbond = (h_index, o_index, neighbor_distance)
-            hbonds.append(hbond)
-
-# print hydrogen bonds
-for hbond in hbonds:
-    print(f'O({hbond[1]}) -- H({hbond[0]}) : {hbond[2]:.3f} Å')
\ No newline at end of file
+        atoms = read(args.input_file)
+        hb = find_hbonds(atoms, **criteria)
+        # print hydrogen bonds
+        for o, h, donor, dist, ang in zip(hb['acceptor'], hb['h'], hb['donor'], hb['distance'], hb['angle']):
+            if donor >= 0:
+                print(f'O({o}) -- H({h}) : {dist:.3f} Å  donor O({donor}) {ang:.1f}°')
+            else:
+                print(f'O({o}) -- H({h}) : {dist:.3f} Å')
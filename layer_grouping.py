@@ -1,54 +1,156 @@
-""" find the index of the oxygen atoms and hydrogen atoms along the layers """
+""" find the index of the oxygen atoms and hydrogen atoms along the layers
+
+usage: python layer_grouping.py -i CONTCAR (-l) (-a) (--tol 0.5) (-e Pt Ir)
+       python layer_grouping.py -i XDATCAR --traj (--stride 10)   (occupancy -> layer_occupancy.csv)
+
+Atoms are clustered along z with a tolerance (as the z_tol layer averaging of
+the BJ parameters): sorted z values are split into a new layer wherever the
+gap to the previous atom is larger than tol, so a layer sitting on an
+integer z is no longer cut in two. Pt is left out unless -a is given
+(or other elements with -e).
+
+In trajectory mode the layers of the first frame define the windows
+(boundaries halfway between neighbouring layers) and the number of atoms of
+each element in every layer is counted frame by frame, chunk-wise.
+
+    from layer_grouping import find_layers
+    for layer in find_layers(atoms, exclude=['Pt']):
+        layer['layer'], layer['z'], layer['indices']['O']
+"""
 from ase.io import read
-import os 
-import subprocess
-import argparse   
+import os
+import argparse
 import numpy as np
 
-parser = argparse.ArgumentParser()
-parser.add_argument('-i', '--input', help='input file', default='CONTCAR')
-parser.add_argument('-l', '--list', help='show in list type', default=False, action='store_true')
-parser.add_argument('-a', '--all', help='show all atoms', default=False, action='store_true')
-args = parser.parse_args()
+Z_TOL = 0.5  # Å, max z gap inside one layer
+
+
+def cluster_z(z, tol=Z_TOL):
+    """
+    1D gap clustering of z values.
+
+    Returns:
+        labels (layer of each value, 0 = lowest) and the mean z of each layer
+    """
+    z = np.asarray(z, dtype=float)
+    if z.size == 0:
+        return np.zeros(0, dtype=int), np.zeros(0)
+    order = np.argsort(z, kind='stable')
+    new_layer = np.diff(z[order]) > tol
+    labels = np.empty(len(z), dtype=int)
+    labels[order] = np.concatenate([[0], np.cumsum(new_layer)])
+    means = np.bincount(labels, weights=z) / np.bincount(labels)
+    return labels, means
+
+
+def find_layers(atoms, tol=Z_TOL, exclude=('Pt',)):
+    """
+    Layers of atoms along z.
+
+    Args:
+        atoms: Atoms
+        tol: Max z gap inside one layer (Å)
+        exclude: Elements left out of the clustering
+
+    Returns:
+        list of dict (lowest first) with 'layer' (0-based), 'z' (mean z) and
+        'indices' ({element: index array}, elements in order of appearance)
+    """
+    symbols = np.array(atoms.get_chemical_symbols())
+    selected = np.flatnonzero(~np.isin(symbols, list(exclude or [])))
+    labels, means = cluster_z(atoms.positions[selected, 2], tol)
+    layers = []
+    for k, z in enumerate(means):
+        members = selected[labels == k]
+        elements = dict.fromkeys(symbols[members])
+        layers.append({
+            'layer': k,
+            'z': float(z),
+            'indices': {el: members[symbols[members] == el] for el in elements},
+        })
+    return layers
+
+
+def atoms_below(atoms, z_cut, tol=Z_TOL, exclude=()):
+    """Indices of the atoms in layers whose mean z is below z_cut (a layer is never split)."""
+    layers = find_layers(atoms, tol, exclude)
+    indices = [idx for layer in layers if layer['z'] < z_cut for idx in layer['indices'].values()]
+    return np.sort(np.concatenate(indices)) if indices else np.zeros(0, dtype=int)
+
 
-if args.input:
-    filename=args.input
+def print_layers(layers, as_list=False):
+    """Print each layer with the number and indices of its atoms per element."""
+    for i, layer in enumerate(layers):
+        print(f"  [ {i+1} ] {layer['z']:.2f} Å ".center(40, '-'))
+        for element, indices in layer['indices'].items():
+            if as_list:
+                print(element, len(indices), indices.tolist())
+            else:
+                print(element, len(indices), indices)
+
+
+def layer_occupancy(path, tol=Z_TOL, exclude=('Pt',), stride=1, chunk=1000):
+    """
+    Number of atoms of each element per layer in every stride-th frame.
+
+    Layers are taken from the first frame; an atom belongs to the layer whose
+    window (halfway to the neighbouring layers) contains its z.
+
+    Returns:
+        layers of the first frame, column names ('L1_O', ...) and an int
+        array (n_frames, n_columns)
+    """
+    from trajstore import iter_chunks, iter_frames
+
+    first = next(iter_frames(path))
+    symbols = np.array(first.get_chemical_symbols())
+    layers = find_layers(first, tol, exclude)
+    selected = np.flatnonzero(~np.isin(symbols, list(exclude or [])))
+    elements, element_id = np.unique(symbols[selected], return_inverse=True)
+    means = np.array([layer['z'] for layer in layers])
+    boundaries = (means[1:] + means[:-1]) / 2
+    n_layers, n_elements = len(means), len(elements)
+
+    blocks = []
+    for positions, _, _ in iter_chunks(path, stride, chunk):
+        z = positions[:, selected, 2]
+        layer_id = np.searchsorted(boundaries, z)
+        # one bincount over (frame, layer, element) for the whole chunk
+        key = (np.arange(len(z))[:, None] * n_layers + layer_id) * n_elements + element_id
+        counts = np.bincount(key.ravel(), minlength=len(z) * n_layers * n_elements)
+        blocks.append(counts.reshape(len(z), n_layers * n_elements))
+    columns = [f'L{k+1}_{el}' for k in range(n_layers) for el in elements]
+    table = np.concatenate(blocks) if blocks else np.zeros((0, len(columns)), dtype=int)
+    return layers, columns, table
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-i', '--input', help='input file', default='CONTCAR')
+    parser.add_argument('-l', '--list', help='show in list type', default=False, action='store_true')
+    parser.add_argument('-a', '--all', help='show all atoms', default=False, action='store_true')
+    parser.add_argument('-e', '--exclude', help='elements left out (default: Pt)', nargs='+', default=['Pt'])
+    parser.add_argument('--tol', help='max z gap inside one layer (Å)', type=float, default=Z_TOL)
+    parser.add_argument('-t', '--traj', help='layer occupancy over a trajectory', default=False, action='store_true')
+    parser.add_argument('--stride', help='use every n-th frame (trajectory mode)', type=int, default=1)
+    args = parser.parse_args()
+
+    filename = args.input
     if not os.path.exists(filename):
         print(f"{filename} does not exist")
         print('Use -i option to specify input file')
         exit()
     else:
         print('Your inputfile is:', filename)
+    exclude = [] if args.all else args.exclude
 
-atoms=read(filename)
-
-""" grouping atoms along the layers """
-
-# extract integer only from the z coordinates
-group={}
-for atom in atoms:
-    if args.all:
-        z_int=int(atom.z)
-    else:
-        if atom.symbol != 'Pt':
-            z_int=int(atom.z)
-        else:
-            continue
-    if z_int in group:
-        if atom.symbol in group[z_int]:
-            group[z_int][atom.symbol].append(atom.index)
-        else:
-            group[z_int][atom.symbol]=[atom.index]
+    if args.traj:
+        layers, columns, table = layer_occupancy(filename, args.tol, exclude, args.stride)
+        print_layers(layers, args.list)
+        frames = np.arange(len(table)) * args.stride
+        np.savetxt('layer_occupancy.csv', np.column_stack([frames, table]), fmt='%d',
+                   delimiter=',', header=','.join(['frame'] + columns), comments='')
+        print(f"{len(table)} frames written to layer_occupancy.csv")
     else:
-        group[z_int]={}
-        group[z_int][atom.symbol]=[atom.index]
-group=dict(sorted(group.items()))
-
-for i, key in enumerate(group):
-    print(f"  [ {i+1} ] {key} Å ".center(40, '-'))
-    for key2 in group[key]:
-        if args.list:
-            print(key2, len(group[key][key2]), group[key][key2])
-        else:
-            print(key2, len(group[key][key2]), np.array(group[key][key2]))
-
+        atoms = read(filename)
+        print_layers(find_layers(atoms, args.tol, exclude), args.list)
@@ -0,0 +1,146 @@
+"""
+Shared periodic neighbour list for the structure analysis scripts.
+
+find_o_type.py and hbond.py both need short-range O-O / O-H pairs of the
+same structure. Here the cell-list search (ase.neighborlist.neighbor_list)
+runs once per structure at the largest cutoff asked for so far, and
+element-filtered radius queries are answered by masking that list. Lists
+are cached on a hash of numbers, positions, cell and pbc, so analyses run
+back to back on the same structure (or an identical copy read again) share
+one build instead of each doing its own scan.
+
+usage:
+    from neighbors import get_neighbor_list
+    nl = get_neighbor_list(atoms, 2.3)
+    i, j, d, D = nl.pairs('O', 'H', 1.2)    # O-H pairs closer than 1.2 Å
+    i, j, d, D = nl.pairs('H', 'O', 2.3, rmin=1.2)
+
+    d = batch_pair_distances(positions, cells, pbc, i, j)   # (n_frames, n_pairs), MIC
+"""
+
+import hashlib
+import itertools
+from collections import OrderedDict
+
+import numpy as np
+from ase.geometry import find_mic
+from ase.neighborlist import neighbor_list
+
+MAX_CACHED = 8
+
+# structure hash -> NeighborList, least recently used first
+_CACHE = OrderedDict()
+
+
+def structure_key(atoms):
+    """Hash of numbers, positions, cell and pbc; equal for identical structures."""
+    h = hashlib.sha1()
+    for array in (atoms.numbers, atoms.positions, atoms.cell.array, atoms.pbc):
+        h.update(np.ascontiguousarray(array).tobytes())
+    return h.hexdigest()
+
+
+class NeighborList:
+    """All pairs closer than cutoff (both i-j and j-i, one entry per periodic image)."""
+
+    def __init__(self, atoms, cutoff):
+        self.cutoff = float(cutoff)
+        self.symbols = np.array(atoms.get_chemical_symbols())
+        i, j, d, D = neighbor_list('ijdD', atoms, self.cutoff)
+        # sorted by i, then j, nearest image first
+        order = np.lexsort((d, j, i))
+        self.i, self.j, self.d, self.D = i[order], j[order], d[order], D[order]
+
+    def pairs(self, a=None, b=None, rmax=None, rmin=0.0, nearest_image=True):
+        """
+        Pairs i-j with rmin < d < rmax, sorted by i then j.
+
+        Args:
+            a, b: Element (or list of elements) of i and of j; None for any
+            rmax: Upper distance bound, at most the list cutoff (default: cutoff)
+            rmin: Lower distance bound
+            nearest_image: Keep only the nearest periodic image of each i-j pair
+
+        Returns:
+            i, j, d, D (D = vector from i to j)
+        """
+        if rmax is None:
+            rmax = self.cutoff
+        elif rmax > self.cutoff:
+            raise ValueError(f"rmax {rmax} exceeds the neighbour list cutoff {self.cutoff}")
+        mask = self.d < rmax
+        if rmin > 0:
+            mask &= self.d > rmin
+        if a is not None:
+            mask &= np.isin(self.symbols[self.i], a)
+        if b is not None:
+            mask &= np.isin(self.symbols[self.j], b)
+        i, j, d, D = self.i[mask], self.j[mask], self.d[mask], self.D[mask]
+        if nearest_image and len(i):
+            first = np.ones(len(i), dtype=bool)
+            first[1:] = (i[1:] != i[:-1]) | (j[1:] != j[:-1])
+            i, j, d, D = i[first], j[first], d[first], D[first]
+        return i, j, d, D
+
+
+def get_neighbor_list(atoms, cutoff):
+    """
+    Neighbour list of atoms covering at least cutoff, from the cache when possible.
+
+    A cached list with a smaller cutoff is rebuilt at the new one and replaced.
+    """
+    key = structure_key(atoms)
+    nl = _CACHE.get(key)
+    if nl is None or nl.cutoff < cutoff:
+        nl = NeighborList(atoms, cutoff)
+        _CACHE[key] = nl
+    _CACHE.move_to_end(key)
+    while len(_CACHE) > MAX_CACHED:
+        _CACHE.popitem(last=False)
+    return nl
+
+
+def clear_neighbor_cache():
+    """Drop all cached neighbour lists."""
+    _CACHE.clear()
+
+
+def pair_distances(atoms, i, j, mic=False):
+    """Distances of the index pairs i[k]-j[k] in one vectorized call (any separation)."""
+    i = np.asarray(i, dtype=int)
+    j = np.asarray(j, dtype=int)
+    D = atoms.positions[j] - atoms.positions[i]
+    if mic:
+        D, d = find_mic(D, atoms.cell, atoms.pbc)
+        return d
+    return np.linalg.norm(D, axis=1)
+
+
+def batch_pair_distances(positions, cells, pbc, i, j, mic=True):
+    """
+    Distances of the index pairs i[k]-j[k] in many frames (e.g. NEB images) at once.
+
+    Args:
+        positions: (n_frames, n_atoms, 3) array
+        cells: (n_frames, 3, 3) array, or one (3, 3) cell for all frames
+        pbc: Periodic directions, shared by all frames
+        i, j: Atom indices of the pairs
+        mic: Minimum image convention along the periodic directions
+
+    Returns:
+        (n_frames, n_pairs) array of distances
+    """
+    i = np.asarray(i, dtype=int)
+    j = np.asarray(j, dtype=int)
+    positions = np.asarray(positions, dtype=float)
+    D = positions[:, j] - positions[:, i]
+    pbc = np.broadcast_to(np.asarray(pbc, dtype=bool), 3)
+    if not mic or not pbc.any():
+        return np.linalg.norm(D, axis=-1)
+    cells = np.broadcast_to(np.asarray(cells, dtype=float), (len(D), 3, 3))
+    frac = np.einsum('fpa,fab->fpb', D, np.linalg.inv(cells))
+    frac[..., pbc] -= np.round(frac[..., pbc])
+    # the nearest image is within one cell of the wrapped vector, also for skewed cells
+    shifts = np.unique(np.array(list(itertools.product((-1, 0, 1), repeat=3))) * pbc, axis=0)
+    images = np.einsum('fpsa,fab->fpsb', frac[:, :, None, :] + shifts, cells)
+    return np.sqrt(np.einsum('fpsa,fpsa->fps', images, images)).min(axis=-1)
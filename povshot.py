@@ -8,9 +8,20 @@ from ase.io.trajectory import Trajectory
 import numpy as np
 import sys
 import os 
-import subprocess
 import argparse   
 
+
+try:
+    from vasp.ase_convert import convert
+except ImportError:
+    try:
+        from ase_convert import convert
+    except ImportError:
+        # copied into a job folder, away from the repo: plain ase read/write
+        def convert(src, dst, index=':', atoms=None):
+            write(dst, read(src, index=index) if atoms is None else atoms)
+
+
 class AsePov():
     def __init__(self, atoms):
         self.atoms=atoms
@@ -55,13 +66,11 @@ if args.input:
     else:
         atoms=read(filename)
         if 'POSCAR' in filename:
-            subprocess.run(['ase', 'convert', '-f', filename, 'initial.json'])
+            convert(filename, 'initial.json', atoms=atoms)
             filename='initial.json'
-            atoms=read(filename)
         elif 'CONTCAR' in filename:
-            subprocess.run(['ase', 'convert', '-f', filename, 'final.json'])
+            convert(filename, 'final.json', atoms=atoms)
             filename='final.json'
-            atoms=read(filename)
         elif 'traj' in filename:
             if args.num:
                 num=args.num
@@ -1,10 +1,10 @@
 """ Generates the structure of the selected iteration """
 
-from ase.io.vasp import read_vasp_xdatcar
 from ase.io.trajectory import Trajectory
-from ase.io import read, write
+from ase.io import write
 import os
 import argparse  
+from xdatcar import read_xdatcar_frame
 
 parser = argparse.ArgumentParser()
 parser.add_argument('-i', '--input', help='input file', type=str)
@@ -16,7 +16,8 @@ if args.input:
     input_file=args.input
     if os.path.exists(input_file):
         if 'XDATCAR' in input_file:
-            traj = read_vasp_xdatcar(input_file,index=0)
+            # frame offsets are indexed once and cached next to the file
+            traj = None
         elif 'traj' in input_file:
             traj = Trajectory(input_file)
         else:
@@ -37,7 +38,10 @@ else:
     iteration=0
     print('iteration:', iteration)
 
-atoms=traj[iteration]
+if traj is None:
+    atoms=read_xdatcar_frame(input_file, iteration)
+else:
+    atoms=traj[iteration]
 if iteration == -1:
     write(f'iter_last.json', atoms)
 elif iteration == 0:
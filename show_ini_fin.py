@@ -13,12 +13,17 @@ import cairosvg
 import os
 import io
 from ase import Atom, Atoms
-from ase.io import read, write
+from ase.io import write
 from matplotlib import pyplot as plt
 import matplotlib.image as mpimg
 import sys
 import time
-import numpy as np
+try:
+    from vasp.ase_convert import convert, read_frame
+    from vasp.convergence import check_convergence
+except ImportError:
+    from ase_convert import convert, read_frame
+    from convergence import check_convergence
 
 start_time = time.time()
 
@@ -121,15 +126,15 @@ def select_input():
     # final
     if 'final_with_calculator.json' in os.listdir():
         final='final_with_calculator.json'
-        atoms=read(final)
+        atoms=read_frame(final)
         E0=atoms.get_potential_energy()
-        forces = atoms.get_forces()
-        max_force = np.max(np.sqrt(np.sum(forces**2, axis=1)))
-        max_force = round(max_force, 3)
+        result = check_convergence(atoms.get_forces(), atoms)
+        max_force = round(result['max'], 3)
         if any(fname.startswith("initial_") for fname in os.listdir()):
             initial = next(fname for fname in os.listdir() if fname.startswith("initial_"))
         else:
             initial = "restart.json"
+        # same test as before: max force rounded to 3 decimals, <= 0.030 is converged
         if max_force <= 0.030:
             status='Converged'
         else:
@@ -137,14 +142,12 @@ def select_input():
     else:
         if 'CONTCAR' in os.listdir() and os.path.getsize('CONTCAR') > 0:
             iteration, E0 = get_iteration()
-            os.system('ase convert -f OUTCAR running_{}.json'.format(iteration))
-            initial=[a for a in os.listdir() if a.startswith('initial_')][0]
             final='running_{}.json'.format(iteration)
+            # full OUTCAR history, as `ase convert -f OUTCAR running_N.json`; the last step is drawn
+            atoms=convert('OUTCAR', final)[-1]
+            initial=[a for a in os.listdir() if a.startswith('initial_')][0]
             status='Running'
-            atoms=read(final)
-            forces = atoms.get_forces()
-            max_force = np.max(np.sqrt(np.sum(forces**2, axis=1)))
-            max_force = round(max_force, 3)
+            max_force = round(check_convergence(atoms.get_forces(), atoms)['max'], 3)
 
         else:
             status='Not_started'
@@ -189,7 +192,7 @@ if repeat==False:
         initial, final, status, E0, max_force = select_input()
         for j, atoms in enumerate([initial, final]):
             ax = fig.add_subplot(1, 2, j+1)
-            atoms=read(atoms)
+            atoms=read_frame(atoms)
             svgs=atoms_view(atoms)
             string=svgs.tostr()
             svg_string = string
@@ -226,7 +229,7 @@ elif repeat:
         
         for j, atoms in enumerate([initial, final]):
             ax = fig.add_subplot(1,2, j+1)
-            atoms=read(atoms)
+            atoms=read_frame(atoms)
             svgs=atoms_view2(atoms) #svgs.tostring() if single_view() svgs.tostr() if atoms_view2()   
             string=svgs.tostr()
             svg_string = string
@@ -0,0 +1,123 @@
+"""
+Regression tests for vasp/outcar.py: the last ionic step of an OUTCAR,
+also when the run was killed in the middle of a step.
+
+    python -m pytest tests/test_outcar.py
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'vasp'))
+from outcar import read_outcar_last_frame  # noqa: E402
+
+CELL = np.diag([5.0, 5.0, 12.0])
+SCF_ENERGIES = [12.3, -4.1, -6.2]   # energies printed during the SCF loop
+
+HEADER = """ vasp.6.3.0 18Jan22 (build Feb 08 2022) complex
+ POTCAR:    PAW_PBE O 08Apr2002
+ POTCAR:    PAW_PBE H 15Jun2001
+ POTCAR:    PAW_PBE O 08Apr2002
+ POTCAR:    PAW_PBE H 15Jun2001
+   ions per type =               1   2
+
+ Dimension of arrays:
+"""
+
+
+def _scf(step, n_iter=len(SCF_ENERGIES)):
+    text = ''
+    for k, e in enumerate(SCF_ENERGIES[:n_iter]):
+        text += (f"----------------------------------------- Iteration {step:4d}({k + 1:4d})  "
+                 f"---------------------------------------\n\n"
+                 f"  free energy    TOTEN  =     {e + 0.01:14.8f} eV\n\n"
+                 f"  energy without entropy =  {e:14.8f}  energy(sigma->0) =  {e:14.8f}\n\n")
+    return text
+
+
+def _step(step, positions, forces, free_energy, energy):
+    lines = ["      direct lattice vectors                 reciprocal lattice vectors\n"]
+    lines += [f"    {a:12.9f}{b:13.9f}{c:13.9f}     0.2 0.0 0.0\n" for a, b, c in CELL]
+    text = ''.join(lines) + '\n' + _scf(step)
+    text += ("------------------------ aborting loop because EDIFF is reached "
+             "----------------------------------------\n\n")
+    text += " magnetization (x)\n\n# of ion       s       p       d       tot\n"
+    text += "------------------------------------------\n"
+    text += ''.join(f"    {i + 1}        0.000   0.{i + 1}00   0.000   0.{i + 1}00\n" for i in range(3))
+    text += "--------------------------------------------------\n\n"
+    text += " POSITION                                       TOTAL-FORCE (eV/Angst)\n"
+    text += " " + "-" * 83 + "\n"
+    text += ''.join(f"  {p[0]:12.5f}{p[1]:12.5f}{p[2]:12.5f}  {f[0]:13.6f}{f[1]:13.6f}{f[2]:13.6f}\n"
+                    for p, f in zip(positions, forces))
+    text += " " + "-" * 83 + "\n\n\n"
+    text += ("  FREE ENERGIE OF THE ION-ELECTRON SYSTEM (eV)\n"
+             "  ---------------------------------------------------\n"
+             f"  free  energy   TOTEN  =     {free_energy:14.8f} eV\n\n"
+             f"  energy  without entropy=  {energy:14.8f}  energy(sigma->0) =  {energy:14.8f}\n\n\n")
+    return text
+
+
+STEP1 = dict(positions=np.array([[1.0, 1.0, 1.0], [1.9, 1.0, 1.0], [1.0, 1.9, 1.0]]),
+             forces=np.array([[0.1, 0.0, 0.0], [-0.1, 0.0, 0.0], [0.0, 0.05, 0.0]]),
+             free_energy=-6.5, energy=-6.49)
+STEP2 = dict(positions=STEP1['positions'] + 0.02,
+             forces=STEP1['forces'] / 2,
+             free_energy=-6.6, energy=-6.59)
+
+
+def _write(tmp_path, text):
+    path = tmp_path / 'OUTCAR'
+    path.write_text(text)
+    return str(path)
+
+
+def _check(atoms, step):
+    assert atoms.get_chemical_symbols() == ['O', 'H', 'H']
+    assert np.allclose(atoms.positions, step['positions'])
+    assert np.allclose(atoms.get_forces(), step['forces'])
+    assert atoms.get_potential_energy() == pytest.approx(step['energy'])
+    assert atoms.calc.results['free_energy'] == pytest.approx(step['free_energy'])
+    assert np.allclose(atoms.cell.array, CELL)
+
+
+def test_complete_outcar_returns_last_step(tmp_path):
+    path = _write(tmp_path, HEADER + _step(1, **STEP1) + _step(2, **STEP2))
+    atoms = read_outcar_last_frame(path)
+    _check(atoms, STEP2)
+    assert np.allclose(atoms.get_magnetic_moments(), [0.1, 0.2, 0.3])
+
+
+def test_killed_during_scf_returns_previous_step(tmp_path):
+    # killed while step 2 was still iterating: its SCF energy lines must not be used
+    complete = HEADER + _step(1, **STEP1)
+    path = _write(tmp_path, complete + _scf(2, n_iter=2))
+    _check(read_outcar_last_frame(path), STEP1)
+
+
+def test_killed_before_free_energy_block_returns_previous_step(tmp_path):
+    text = HEADER + _step(1, **STEP1) + _step(2, **STEP2)
+    cut = text.rindex('  FREE ENERGIE OF THE ION-ELECTRON SYSTEM')
+    path = _write(tmp_path, text[:cut])
+    _check(read_outcar_last_frame(path), STEP1)
+
+
+def test_killed_inside_free_energy_block_returns_previous_step(tmp_path):
+    text = HEADER + _step(1, **STEP1) + _step(2, **STEP2)
+    cut = text.rindex('energy(sigma->0)') + len('energy(sigma->0) =')
+    path = _write(tmp_path, text[:cut])
+    _check(read_outcar_last_frame(path), STEP1)
+
+
+def test_no_complete_step_raises(tmp_path):
+    path = _write(tmp_path, HEADER + _scf(1))
+    with pytest.raises(ValueError):
+        read_outcar_last_frame(path)
+
+
+def test_pseudo_hydrogen_potcar_label(tmp_path):
+    # fractional-charge pseudo-hydrogen (H.75), e.g. for passivating a slab
+    header = HEADER.replace('PAW_PBE H 15Jun2001', 'PAW_PBE H.75 07Oct2010')
+    path = _write(tmp_path, header + _step(1, **STEP1))
+    _check(read_outcar_last_frame(path), STEP1)
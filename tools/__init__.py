@@ -5,9 +5,12 @@ This package contains utilities for processing DFT calculations and related data
 
 Modules:
     formation_energy: Calculate formation energies from raw DFT energies
+    formula: Shared, cached chemical formula parser
 """
 
 from .formation_energy import FormationEnergyCalculator, calculate_formation_energy
+from .formula import parse_formula, composition_matrix
 
-__all__ = ['FormationEnergyCalculator', 'calculate_formation_energy']
-__version__ = '1.0.0'
+__all__ = ['FormationEnergyCalculator', 'calculate_formation_energy',
+           'parse_formula', 'composition_matrix']
+__version__ = '1.1.0'
@@ -25,11 +25,15 @@ Usage:
 
 import pandas as pd
 import numpy as np
-import re
 from pathlib import Path
-from typing import Dict, Optional, List, Tuple
+from typing import Mapping, Optional, List, Tuple
 import warnings
 
+try:
+    from .formula import parse_formula, composition_matrix
+except ImportError:
+    from formula import parse_formula, composition_matrix
+
 
 class FormationEnergyCalculator:
     """
@@ -57,6 +61,7 @@ class FormationEnergyCalculator:
         self.df = self._load_data(filepath, sheet_name)
         self._normalize_column_names()
         self._apply_energy_correction()
+        self._build_slab_index()
         self.ref_energies = {}
         self.elements = []
         
@@ -138,7 +143,7 @@ class FormationEnergyCalculator:
             self.df['corrected_energy'] = self.df['raw_energy']
             print("No correction_energy column found, using raw_energy as is")
     
-    def _parse_formula(self, formula: str) -> Dict[str, int]:
+    def _parse_formula(self, formula: str) -> Mapping[str, int]:
         """
         Parse a chemical formula to extract element counts.
         
@@ -146,26 +151,9 @@ class FormationEnergyCalculator:
             formula: Chemical formula string (e.g., 'C2H4', 'H2O')
         
         Returns:
-            Dictionary mapping element symbols to counts
+            Read-only mapping of element symbols to counts (cached, see tools.formula)
         """
-        # Remove common suffixes and special characters
-        formula = formula.replace('_ref', '').replace('_', '').replace('-', '').replace('+', '')
-        
-        # Skip slab
-        if formula.lower() == 'slab':
-            return {}
-        
-        # Pattern to match element symbol followed by optional number
-        pattern = r'([A-Z][a-z]?)(\d*)'
-        matches = re.findall(pattern, formula)
-        
-        composition = {}
-        for element, count in matches:
-            if element:  # Skip empty matches
-                count = int(count) if count else 1
-                composition[element] = composition.get(element, 0) + count
-        
-        return composition
+        return parse_formula(formula)
     
     def _extract_elements(self) -> List[str]:
         """
@@ -174,13 +162,8 @@ class FormationEnergyCalculator:
         Returns:
             List of element symbols
         """
-        all_elements = set()
-        
-        for species in self.df['species_name'].unique():
-            composition = self._parse_formula(species)
-            all_elements.update(composition.keys())
-        
-        return sorted(list(all_elements))
+        _, elements = composition_matrix(self.df['species_name'].unique())
+        return elements
     
     def _calculate_reference_energies(self):
         """
@@ -261,46 +244,73 @@ class FormationEnergyCalculator:
         for element, energy in self.ref_energies.items():
             print(f"  E_ref({element}) = {energy:.6f} eV")
     
-    def _get_slab_energy(self, surface_name: str, site_name: str) -> Optional[float]:
+    def _build_slab_index(self):
         """
-        Get the corrected energy of a slab for a given surface and site.
+        Build the slab-energy lookup index used by _get_slab_energy.
         
-        Args:
-            surface_name: Name of the surface
-            site_name: Name of the site/facet
-        
-        Returns:
-            Slab energy or None if not found
+        Stores the first slab energy per (surface_name, site_name), the first per
+        surface_name, and the first slab overall as the global fallback.
+        Entries with missing surface or site names are not indexed since they
+        never match a lookup.
         """
-        # Check if surface_name and site_name columns exist
-        has_surface = 'surface_name' in self.df.columns
-        has_site = 'site_name' in self.df.columns
+        self._slab_by_site = {}
+        self._slab_by_surface = {}
+        self._slab_default = None
         
         # Filter for slab entries
         slab_df = self.df[
             (self.df['type'].str.lower() == 'slab') |
             (self.df['species_name'].str.lower() == 'slab')
-        ].copy()
+        ]
         
         if slab_df.empty:
-            return None
+            return
+        
+        energies = slab_df['corrected_energy'].to_numpy()
+        self._slab_default = energies[0]
+        
+        if 'surface_name' not in self.df.columns:
+            return
+        
+        surfaces = slab_df['surface_name'].to_numpy()
+        if 'site_name' in self.df.columns:
+            sites = slab_df['site_name'].to_numpy()
+        else:
+            sites = [None] * len(slab_df)
+        
+        for surface, site, energy in zip(surfaces, sites, energies):
+            if pd.isna(surface):
+                continue
+            self._slab_by_surface.setdefault(surface, energy)
+            if site is not None and not pd.isna(site):
+                self._slab_by_site.setdefault((surface, site), energy)
+    
+    def _get_slab_energy(self, surface_name: str, site_name: str) -> Optional[float]:
+        """
+        Get the corrected energy of a slab for a given surface and site.
         
-        # Try to find matching slab
-        if has_surface and has_site:
-            match = slab_df[
-                (slab_df['surface_name'] == surface_name) &
-                (slab_df['site_name'] == site_name)
-            ]
-            if not match.empty:
-                return match.iloc[0]['corrected_energy']
+        Looks up the index built at load time: exact (surface, site) match first,
+        then surface only, then the first slab in the dataset.
         
-        if has_surface:
-            match = slab_df[slab_df['surface_name'] == surface_name]
-            if not match.empty:
-                return match.iloc[0]['corrected_energy']
+        Args:
+            surface_name: Name of the surface
+            site_name: Name of the site/facet
         
-        # Return first slab if no specific match
-        return slab_df.iloc[0]['corrected_energy']
+        Returns:
+            Slab energy or None if not found
+        """
+        try:
+            energy = self._slab_by_site.get((surface_name, site_name))
+            if energy is None:
+                energy = self._slab_by_surface.get(surface_name)
+        except TypeError:
+            # Unhashable keys cannot match any slab
+            energy = None
+        
+        if energy is None:
+            energy = self._slab_default
+        
+        return energy
     
     def _calculate_formation_energy_for_row(self, row: pd.Series) -> Optional[float]:
         """
@@ -363,6 +373,153 @@ class FormationEnergyCalculator:
         
         return formation_energy
     
+    def _build_composition_matrix(self, species: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+        """
+        Parse each unique species once into a dense composition matrix.
+        
+        Args:
+            species: Series of species names (one entry per row)
+        
+        Returns:
+            Tuple (codes, uniques, matrix, elements) where codes maps every row to
+            its unique species and matrix[i, j] is the count of elements[j] in uniques[i]
+        """
+        codes, uniques = pd.factorize(species)
+        matrix, elements = composition_matrix(uniques)
+        
+        return codes, uniques, matrix, elements
+    
+    def _merge_slab_energies(self, ads_df: pd.DataFrame) -> Optional[np.ndarray]:
+        """
+        Look up slab energies for all adsorbate rows at once.
+        
+        Uses the same fallback order as _get_slab_energy: exact (surface_name, site_name)
+        match, then surface_name only, then the first slab in the dataset.
+        
+        Args:
+            ads_df: Adsorbate rows (must contain surface_name)
+        
+        Returns:
+            Array of slab energies aligned with ads_df, or None if there is no slab
+        """
+        slab_df = self.df[
+            (self.df['type'].str.lower() == 'slab') |
+            (self.df['species_name'].str.lower() == 'slab')
+        ]
+        
+        if slab_df.empty:
+            return None
+        
+        # Global fallback: first slab in the dataset
+        slab_energy = np.full(len(ads_df), slab_df['corrected_energy'].iloc[0])
+        found = np.zeros(len(ads_df), dtype=bool)
+        
+        # Exact (surface, site) match first, then surface only. Missing keys never
+        # match, as with the element-wise comparison in _get_slab_energy.
+        key_sets = [['surface_name']]
+        if 'site_name' in self.df.columns:
+            key_sets.insert(0, ['surface_name', 'site_name'])
+        
+        for keys in key_sets:
+            first_slabs = slab_df.drop_duplicates(subset=keys)[keys + ['corrected_energy']]
+            merged = ads_df[keys].merge(first_slabs, on=keys, how='left', indicator=True)
+            matched = (
+                (merged['_merge'] == 'both').to_numpy()
+                & ads_df[keys].notna().all(axis=1).to_numpy()
+                & ~found
+            )
+            slab_energy[matched] = merged['corrected_energy'].to_numpy()[matched]
+            found |= matched
+        
+        return slab_energy
+    
+    def _reference_contributions(self, uniques) -> np.ndarray:
+        """
+        Reference energy contribution sum(count * E_ref) of each unique species.
+        
+        Terms are added in formula order, one column per step for all species at
+        once, so the floating-point result is identical to the per-row sum().
+        Elements without a reference energy contribute 0 (those rows are dropped).
+        
+        Args:
+            uniques: Unique species names
+        
+        Returns:
+            Array of reference contributions aligned with uniques
+        """
+        compositions = [self._parse_formula(name) for name in uniques]
+        width = max((len(composition) for composition in compositions), default=0)
+        terms = np.zeros((len(compositions), width))
+        for i, composition in enumerate(compositions):
+            for k, (elem, count) in enumerate(composition.items()):
+                terms[i, k] = count * self.ref_energies.get(elem, 0.0)
+        
+        total = np.zeros(len(compositions))
+        for k in range(width):
+            total += terms[:, k]
+        return total
+    
+    def _calculate_formation_energies_vectorized(self) -> np.ndarray:
+        """
+        Calculate formation energies for all rows in a single columnar pass.
+        
+        Each unique species is parsed once into a composition matrix, slab energies
+        are joined by (surface_name, site_name), and the reference contributions are
+        accumulated column-wise over all unique species. Gives bit-for-bit the same
+        result as applying _calculate_formation_energy_for_row to every row.
+        
+        Returns:
+            Array of formation energies (NaN where they cannot be calculated)
+        """
+        species = self.df['species_name']
+        codes, uniques, matrix, elements = self._build_composition_matrix(species)
+        
+        phase_type = self.df['type'].str.lower().to_numpy()
+        is_slab = (phase_type == 'slab') | (species.str.lower() == 'slab').to_numpy()
+        is_ads = phase_type == 'ads'
+        corrected_energy = self.df['corrected_energy'].to_numpy(dtype=float)
+        
+        ref_contribution = self._reference_contributions(uniques)[codes]
+        
+        # Species without a parsed composition
+        unique_empty = ~matrix.any(axis=1)
+        empty = unique_empty[codes]
+        
+        # Species containing elements without a reference energy
+        missing_cols = [j for j, elem in enumerate(elements) if elem not in self.ref_energies]
+        unique_missing = matrix[:, missing_cols].any(axis=1) & ~unique_empty
+        for i in np.flatnonzero(unique_missing):
+            missing_refs = [elements[j] for j in missing_cols if matrix[i, j]]
+            warnings.warn(f"Cannot calculate formation energy for {uniques[i]}: "
+                         f"missing reference energies for {missing_refs}")
+        missing = unique_missing[codes]
+        
+        formation_energy = np.full(len(self.df), np.nan)
+        
+        # Gas phase, liquid phase and slab
+        valid = ~empty & ~missing
+        other = valid & ~is_ads
+        formation_energy[other] = corrected_energy[other] - ref_contribution[other]
+        formation_energy[(other | empty) & is_slab] = 0.0
+        
+        # Adsorbates: subtract slab energy
+        ads = valid & is_ads
+        if ads.any():
+            if 'surface_name' not in self.df.columns:
+                for name in species[ads].unique():
+                    warnings.warn(f"No surface information for adsorbate {name}")
+            else:
+                ads_df = self.df[ads]
+                slab_energy = self._merge_slab_energies(ads_df)
+                if slab_energy is None:
+                    for row in ads_df.itertuples(index=False):
+                        warnings.warn(f"Slab energy not found for {row.species_name} on "
+                                      f"{row.surface_name}, {getattr(row, 'site_name', None)}")
+                else:
+                    formation_energy[ads] = corrected_energy[ads] - slab_energy - ref_contribution[ads]
+        
+        return formation_energy
+    
     def calculate_formation_energies(self):
         """
         Calculate formation energies for all species in the dataset.
@@ -379,10 +536,7 @@ class FormationEnergyCalculator:
         
         # Step 3: Calculate formation energies for all rows
         print("\nStep 3: Calculating formation energies...")
-        self.df['formation_energy'] = self.df.apply(
-            self._calculate_formation_energy_for_row,
-            axis=1
-        )
+        self.df['formation_energy'] = self._calculate_formation_energies_vectorized()
         
         # Count how many were successfully calculated
         calculated = self.df['formation_energy'].notna().sum()
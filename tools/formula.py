@@ -0,0 +1,115 @@
+"""
+Chemical Formula Module
+
+This module provides a shared, memoized parser for chemical formulas used by the
+formation energy calculator, the thermodynamics module and the data loaders.
+Each distinct formula is parsed only once per process.
+
+Usage:
+    from tools.formula import parse_formula, composition_matrix
+
+    # Parse a single formula (cached, read-only mapping)
+    comp = parse_formula('CH3OH')      # {'C': 1, 'H': 4, 'O': 1}
+
+    # Element counts for many species at once
+    matrix, elements = composition_matrix(['CH4', 'H2O', 'CO2'])
+"""
+
+import re
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+
+# Element symbol followed by an optional count
+FORMULA_PATTERN = re.compile(r'([A-Z][a-z]?)(\d*)')
+
+
+def _normalize_formula(formula: str) -> str:
+    """Remove common suffixes and special characters from a species name."""
+    return formula.replace('_ref', '').replace('_', '').replace('-', '').replace('+', '')
+
+
+@lru_cache(maxsize=4096)
+def formula_tokens(formula: str) -> Tuple[Tuple[str, int], ...]:
+    """
+    Split a chemical formula into (element, count) tokens in order of appearance.
+
+    Unlike parse_formula, repeated elements are not merged, e.g. 'CH3OH' gives
+    (('C', 1), ('H', 3), ('O', 1), ('H', 1)).
+
+    Args:
+        formula: Chemical formula string (e.g., 'C2H4', 'H2O', 'CO2_ref')
+
+    Returns:
+        Tuple of (element, count) pairs; empty for 'slab'
+    """
+    formula = _normalize_formula(formula)
+
+    # Skip slab
+    if formula.lower() == 'slab':
+        return ()
+
+    return tuple(
+        (element, int(count) if count else 1)
+        for element, count in FORMULA_PATTERN.findall(formula)
+    )
+
+
+@lru_cache(maxsize=4096)
+def parse_formula(formula: str) -> Mapping[str, int]:
+    """
+    Parse a chemical formula to extract element counts.
+
+    The result is cached and returned as a read-only mapping, so it must not be
+    modified by the caller (use dict(...) for a mutable copy).
+
+    Args:
+        formula: Chemical formula string (e.g., 'C2H4', 'H2O')
+
+    Returns:
+        Read-only mapping of element symbols to counts
+    """
+    composition = {}
+    for element, count in formula_tokens(formula):
+        composition[element] = composition.get(element, 0) + count
+
+    return MappingProxyType(composition)
+
+
+def composition_matrix(species: Iterable[str],
+                       elements: Optional[List[str]] = None) -> Tuple[np.ndarray, List[str]]:
+    """
+    Build a dense element-count array for a list of species.
+
+    Args:
+        species: Species names or formulas
+        elements: Column order of the matrix. If None, all elements found in
+                  species are used in sorted order. Elements not listed are ignored.
+
+    Returns:
+        Tuple (matrix, elements) where matrix[i, j] is the count of elements[j]
+        in species[i]
+    """
+    compositions = [parse_formula(name) for name in species]
+
+    if elements is None:
+        elements = sorted({elem for composition in compositions for elem in composition})
+    columns = {elem: j for j, elem in enumerate(elements)}
+
+    matrix = np.zeros((len(compositions), len(elements)))
+    for i, composition in enumerate(compositions):
+        for elem, count in composition.items():
+            j = columns.get(elem)
+            if j is not None:
+                matrix[i, j] = count
+
+    return matrix, list(elements)
+
+
+def clear_formula_cache():
+    """Clear the cached formula parses."""
+    formula_tokens.cache_clear()
+    parse_formula.cache_clear()
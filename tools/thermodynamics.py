@@ -16,7 +16,11 @@ gas = thermo.IdealGas(freqs, species='CO2', symmetrynumber=2, geometry='linear')
 props = gas.get_properties(temperature=300, pressure=1e5)
 print(props)
 
-# Or use convenience functions
+# Evaluate a whole temperature/pressure grid at once
+grid = gas.get_properties_grid(np.linspace(200, 1200, 101), [1e3, 1e5])
+df = gas.get_properties_grid(np.linspace(200, 1200, 101), 1e5, as_dataframe=True)
+
+# Or use convenience functions (cached, see get_thermo_cache_info/clear_thermo_cache)
 props = thermo.calc_gas_thermo('CO2', freqs, T=300, P=1e5)
 props = thermo.calc_ads_thermo(freqs, T=300)
 """
@@ -25,8 +29,14 @@ from ase import units
 from ase.thermochemistry import HarmonicThermo, IdealGasThermo
 import numpy as np
 from typing import List, Dict, Optional, Union, Tuple
+from collections import OrderedDict
 import warnings
 
+try:
+    from .formula import formula_tokens
+except ImportError:
+    from formula import formula_tokens
+
 warnings.filterwarnings("ignore", category=np.VisibleDeprecationWarning)
 
 # Try to import catmap for molecule geometry
@@ -93,6 +103,36 @@ def filter_real_frequencies(frequencies: List[float], threshold: float = 1e-6) -
     return [f for f in frequencies if f > threshold]
 
 
+def _vibrational_grid(vib_energies, temperature: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vibrational energy and entropy contributions on a temperature grid.
+    
+    Parameters:
+    -----------
+    vib_energies : array-like
+        Vibrational energies in eV
+    temperature : np.ndarray
+        Temperatures in K (any shape)
+        
+    Returns:
+    --------
+    tuple of np.ndarray
+        (dU_vib in eV, S_vib in eV/K), both with the shape of temperature
+    """
+    vib_energies = np.asarray(vib_energies, dtype=float)
+    kT = units.kB * temperature[..., np.newaxis]
+    x = vib_energies / kT
+    dU_v = np.sum(vib_energies / (np.exp(x) - 1.), axis=-1)
+    S_v = units.kB * np.sum(x / (np.exp(x) - 1.) - np.log(1. - np.exp(-x)), axis=-1)
+    return dU_v, S_v
+
+
+def _grid_to_dataframe(grid: Dict[str, np.ndarray]):
+    """Flatten a property grid into a long-format DataFrame."""
+    import pandas as pd
+    return pd.DataFrame({key: np.ravel(value) for key, value in grid.items()})
+
+
 class ThermoProperties:
     """Container for thermodynamic properties."""
     
@@ -126,7 +166,7 @@ class ThermoProperties:
         lines.append(f"Temperature: {self.temperature:.2f} K")
         if self.pressure:
             lines.append(f"Pressure: {self.pressure} Pa")
-        if self.frequencies:
+        if self.frequencies is not None and len(self.frequencies):
             lines.append(f"Number of frequencies: {len(self.frequencies)}")
         lines.append("")
         lines.append("Energy corrections (eV):")
@@ -230,12 +270,8 @@ class IdealGas:
                 
                 # Parse simple formulas (e.g., CO2, H2O, CH4)
                 if species:
-                    # Simple parser for common molecules
-                    import re
                     masses = []
-                    for match in re.finditer(r'([A-Z][a-z]?)(\d*)', species):
-                        element = match.group(1)
-                        count = int(match.group(2)) if match.group(2) else 1
+                    for element, count in formula_tokens(species):
                         if element in mass_map:
                             masses.extend([mass_map[element]] * count)
                     
@@ -252,7 +288,7 @@ class IdealGas:
             self.atoms = atoms
         
         # Convert frequencies to eV if needed (assume cm^-1 if > 10)
-        if frequencies and max(frequencies) > 10:
+        if len(frequencies) and max(frequencies) > 10:
             self.frequencies_eV = [cm_to_eV(f) for f in frequencies]
         else:
             self.frequencies_eV = frequencies
@@ -262,6 +298,21 @@ class IdealGas:
         
         if not self.vib_energies:
             raise ValueError("No real positive frequencies for thermochemistry")
+        
+        self._thermo = None
+    
+    @property
+    def thermo(self) -> IdealGasThermo:
+        """ASE IdealGasThermo object, built once on first use."""
+        if self._thermo is None:
+            self._thermo = IdealGasThermo(
+                self.vib_energies,
+                self.geometry,
+                atoms=self.atoms,
+                symmetrynumber=self.symmetrynumber,
+                spin=self.spin
+            )
+        return self._thermo
     
     def get_properties(self, temperature: float = 298.15, pressure: float = 101325) -> ThermoProperties:
         """
@@ -279,13 +330,7 @@ class IdealGas:
         ThermoProperties
             Object containing all thermodynamic properties
         """
-        thermo = IdealGasThermo(
-            self.vib_energies,
-            self.geometry,
-            atoms=self.atoms,
-            symmetrynumber=self.symmetrynumber,
-            spin=self.spin
-        )
+        thermo = self.thermo
         
         ZPE = thermo.get_ZPE_correction()
         H = thermo.get_enthalpy(temperature, verbose=False)
@@ -305,6 +350,94 @@ class IdealGas:
             status='gas'
         )
     
+    def get_properties_grid(self,
+                            T_array: Union[float, List[float], np.ndarray],
+                            P_array: Union[float, List[float], np.ndarray] = 101325,
+                            as_dataframe: bool = False):
+        """
+        Calculate thermodynamic properties on a temperature/pressure grid.
+        
+        All grid points are evaluated at once with NumPy broadcasting over the
+        vibrational energies, using the same expressions as ASE IdealGasThermo.
+        
+        Parameters:
+        -----------
+        T_array : float or array-like
+            Temperatures in Kelvin
+        P_array : float or array-like
+            Pressures in Pascal (default: 101325 = 1 atm)
+        as_dataframe : bool
+            If True, return a long-format DataFrame with one row per (T, P)
+            
+        Returns:
+        --------
+        dict of np.ndarray or pd.DataFrame
+            temperature, pressure, ZPE, H, S, G, Cp; arrays have shape
+            (len(T_array), len(P_array))
+        """
+        thermo = self.thermo
+        atoms = getattr(thermo, 'atoms', None)
+        if atoms is None:
+            raise RuntimeError('atoms must be specified for entropy and free energy calculations.')
+        
+        T = np.atleast_1d(np.asarray(T_array, dtype=float))[:, np.newaxis]
+        P = np.atleast_1d(np.asarray(P_array, dtype=float))[np.newaxis, :]
+        T, P = np.broadcast_arrays(T, P)
+        kT = units.kB * T
+        
+        vib_energies = np.asarray(thermo.vib_energies, dtype=float)
+        dU_v, S_v = _vibrational_grid(vib_energies, T)
+        
+        # Enthalpy: ZPE + translational + rotational + vibrational + (Cv -> Cp)
+        ZPE = 0.5 * np.sum(vib_energies)
+        if self.geometry == 'nonlinear':
+            Cv_r = 3. / 2. * kT
+        elif self.geometry == 'linear':
+            Cv_r = kT
+        else:
+            Cv_r = np.zeros_like(T)
+        H = ZPE + 3. / 2. * kT + Cv_r + dU_v + kT
+        
+        # Translational entropy at the reference pressure (SI units inside the log)
+        mass = np.sum(atoms.get_masses()) * units._amu
+        S_t = (2 * np.pi * mass * units._k * T / units._hplanck**2)**(3.0 / 2)
+        S_t *= units._k * T / thermo.referencepressure
+        S_t = units.kB * (np.log(S_t) + 5.0 / 2.0)
+        
+        # Pressure correction to translational entropy
+        S_p = -units.kB * np.log(P / thermo.referencepressure)
+        
+        # Rotational entropy
+        inertias = atoms.get_moments_of_inertia() * units._amu / 1e10**2
+        if self.geometry == 'nonlinear':
+            S_r = np.sqrt(np.pi * np.prod(inertias)) / self.symmetrynumber
+            S_r = S_r * (8.0 * np.pi**2 * units._k * T / units._hplanck**2)**(3.0 / 2.0)
+            S_r = units.kB * (np.log(S_r) + 3.0 / 2.0)
+        elif self.geometry == 'linear':
+            S_r = (8 * np.pi**2 * max(inertias) * units._k * T /
+                   self.symmetrynumber / units._hplanck**2)
+            S_r = units.kB * (np.log(S_r) + 1.)
+        else:
+            S_r = np.zeros_like(T)
+        
+        # Electronic entropy
+        S_e = units.kB * np.log(2 * self.spin + 1)
+        
+        S = S_t + S_p + S_r + S_e + S_v
+        G = H - T * S
+        Cp = H - ZPE
+        
+        grid = {
+            'temperature': T,
+            'pressure': P,
+            'ZPE': np.full_like(T, ZPE),
+            'H': H,
+            'S': S,
+            'G': G,
+            'Cp': Cp,
+        }
+        return _grid_to_dataframe(grid) if as_dataframe else grid
+    
     def get_free_energy(self, temperature: float = 298.15, pressure: float = 101325) -> float:
         """Get Gibbs free energy correction (ZPE + Cp - TS) in eV."""
         props = self.get_properties(temperature, pressure)
@@ -312,13 +445,11 @@ class IdealGas:
     
     def get_enthalpy(self, temperature: float = 298.15) -> float:
         """Get enthalpy correction (ZPE + Cp) in eV."""
-        props = self.get_properties(temperature)
-        return props.H
+        return self.thermo.get_enthalpy(temperature, verbose=False)
     
     def get_entropy(self, temperature: float = 298.15, pressure: float = 101325) -> float:
         """Get entropy in eV/K."""
-        props = self.get_properties(temperature, pressure)
-        return props.S
+        return self.thermo.get_entropy(temperature, pressure, verbose=False)
 
 
 class Adsorbate:
@@ -343,7 +474,7 @@ class Adsorbate:
         self.frequencies = frequencies
         
         # Convert frequencies to eV if needed (assume cm^-1 if > 10)
-        if frequencies and max(frequencies) > 10:
+        if len(frequencies) and max(frequencies) > 10:
             self.frequencies_eV = [cm_to_eV(f) for f in frequencies]
         else:
             self.frequencies_eV = frequencies
@@ -353,6 +484,15 @@ class Adsorbate:
         
         if not self.vib_energies:
             raise ValueError("No real positive frequencies for thermochemistry")
+        
+        self._thermo = None
+    
+    @property
+    def thermo(self) -> HarmonicThermo:
+        """ASE HarmonicThermo object, built once on first use."""
+        if self._thermo is None:
+            self._thermo = HarmonicThermo(self.vib_energies)
+        return self._thermo
     
     def get_properties(self, temperature: float = 298.15) -> ThermoProperties:
         """
@@ -368,7 +508,7 @@ class Adsorbate:
         ThermoProperties
             Object containing all thermodynamic properties
         """
-        thermo = HarmonicThermo(self.vib_energies)
+        thermo = self.thermo
         
         ZPE = thermo.get_ZPE_correction()
         U = thermo.get_internal_energy(temperature, verbose=False)
@@ -387,20 +527,137 @@ class Adsorbate:
             status='ads'
         )
     
+    def get_properties_grid(self,
+                            T_array: Union[float, List[float], np.ndarray],
+                            as_dataframe: bool = False):
+        """
+        Calculate thermodynamic properties on a temperature grid.
+        
+        All temperatures are evaluated at once with NumPy broadcasting over the
+        vibrational energies, using the same expressions as ASE HarmonicThermo.
+        Harmonic adsorbate properties do not depend on pressure.
+        
+        Parameters:
+        -----------
+        T_array : float or array-like
+            Temperatures in Kelvin
+        as_dataframe : bool
+            If True, return a DataFrame with one row per temperature
+            
+        Returns:
+        --------
+        dict of np.ndarray or pd.DataFrame
+            temperature, ZPE, U, S, F, Cv; arrays have shape (len(T_array),)
+        """
+        T = np.atleast_1d(np.asarray(T_array, dtype=float))
+        
+        vib_energies = np.asarray(self.thermo.vib_energies, dtype=float)
+        dU_v, S = _vibrational_grid(vib_energies, T)
+        
+        ZPE = 0.5 * np.sum(vib_energies)
+        U = ZPE + dU_v
+        F = U - T * S
+        Cv = U - ZPE
+        
+        grid = {
+            'temperature': T,
+            'ZPE': np.full_like(T, ZPE),
+            'U': U,
+            'S': S,
+            'F': F,
+            'Cv': Cv,
+        }
+        return _grid_to_dataframe(grid) if as_dataframe else grid
+    
     def get_free_energy(self, temperature: float = 298.15) -> float:
         """Get Helmholtz free energy correction (ZPE + Cv - TS) in eV."""
-        props = self.get_properties(temperature)
-        return props.F
+        return self.thermo.get_helmholtz_energy(temperature, verbose=False)
     
     def get_internal_energy(self, temperature: float = 298.15) -> float:
         """Get internal energy correction (ZPE + Cv) in eV."""
-        props = self.get_properties(temperature)
-        return props.U
+        return self.thermo.get_internal_energy(temperature, verbose=False)
     
     def get_entropy(self, temperature: float = 298.15) -> float:
         """Get entropy in eV/K."""
-        props = self.get_properties(temperature)
-        return props.S
+        return self.thermo.get_entropy(temperature, verbose=False)
+
+
+# Thermochemistry cache
+
+class _LRUCache:
+    """Bounded least-recently-used cache with hit/miss counters."""
+    
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+    
+    def get(self, key):
+        """Return the cached value for key, or None on a miss."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def put(self, key, value):
+        """Store value, evicting the least recently used entry if full."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    def info(self) -> Dict[str, int]:
+        """Return hits, misses, current size and maxsize."""
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._data), 'maxsize': self.maxsize}
+
+
+# IdealGas/Adsorbate objects keyed on (status, species, frequencies, symmetry,
+# geometry, spin) and their properties keyed additionally on (T, P)
+_THERMO_OBJECT_CACHE = _LRUCache(maxsize=1024)
+_THERMO_PROPERTY_CACHE = _LRUCache(maxsize=4096)
+
+
+def _frequency_key(frequencies: List[float]) -> Tuple[float, ...]:
+    """Hashable key for a frequency list."""
+    return tuple(float(f) for f in frequencies)
+
+
+def _copy_properties(props: ThermoProperties) -> ThermoProperties:
+    """Return a copy so callers cannot modify cached results."""
+    return ThermoProperties(**props.to_dict())
+
+
+def get_thermo_cache_info() -> Dict[str, Dict[str, int]]:
+    """
+    Get hit/miss statistics of the thermochemistry caches.
+    
+    Returns:
+    --------
+    dict
+        {'objects': {...}, 'properties': {...}} with hits, misses, size, maxsize
+    """
+    return {
+        'objects': _THERMO_OBJECT_CACHE.info(),
+        'properties': _THERMO_PROPERTY_CACHE.info(),
+    }
+
+
+def clear_thermo_cache():
+    """Clear the cached IdealGas/Adsorbate objects and properties."""
+    _THERMO_OBJECT_CACHE.clear()
+    _THERMO_PROPERTY_CACHE.clear()
 
 
 # Convenience functions
@@ -413,6 +670,10 @@ def calc_gas_thermo(species: str,
     """
     Calculate gas phase thermochemistry.
     
+    Results are cached on (species, frequencies, symmetrynumber, geometry,
+    spin, T, P); use clear_thermo_cache() to reset. Calls with an explicit
+    atoms object are not cached.
+    
     Parameters:
     -----------
     species : str
@@ -440,8 +701,24 @@ def calc_gas_thermo(species: str,
     freqs = data.get_freq('CO2', reference='Ara')
     props = thermo.calc_gas_thermo('CO2', freqs, T=298.15, P=101325)
     """
-    gas = IdealGas(frequencies, species=species, **kwargs)
-    return gas.get_properties(T, P)
+    if kwargs.get('atoms') is not None:
+        gas = IdealGas(frequencies, species=species, **kwargs)
+        return gas.get_properties(T, P)
+    
+    object_key = ('gas', species, _frequency_key(frequencies),
+                  kwargs.get('symmetrynumber'), kwargs.get('geometry'), kwargs.get('spin', 0))
+    property_key = object_key + (T, P)
+    
+    props = _THERMO_PROPERTY_CACHE.get(property_key)
+    if props is None:
+        gas = _THERMO_OBJECT_CACHE.get(object_key)
+        if gas is None:
+            gas = IdealGas(frequencies, species=species, **kwargs)
+            _THERMO_OBJECT_CACHE.put(object_key, gas)
+        props = gas.get_properties(T, P)
+        _THERMO_PROPERTY_CACHE.put(property_key, props)
+    
+    return _copy_properties(props)
 
 
 def calc_ads_thermo(frequencies: List[float],
@@ -449,6 +726,8 @@ def calc_ads_thermo(frequencies: List[float],
     """
     Calculate adsorbate thermochemistry.
     
+    Results are cached on (frequencies, T); use clear_thermo_cache() to reset.
+    
     Parameters:
     -----------
     frequencies : list of float
@@ -470,8 +749,19 @@ def calc_ads_thermo(frequencies: List[float],
     freqs = data.get_freq('CO', reference='PengRole2020', status='ads')
     props = thermo.calc_ads_thermo(freqs, T=298.15)
     """
-    ads = Adsorbate(frequencies)
-    return ads.get_properties(T)
+    object_key = ('ads', None, _frequency_key(frequencies), None, None, None)
+    property_key = object_key + (T, None)
+    
+    props = _THERMO_PROPERTY_CACHE.get(property_key)
+    if props is None:
+        ads = _THERMO_OBJECT_CACHE.get(object_key)
+        if ads is None:
+            ads = Adsorbate(frequencies)
+            _THERMO_OBJECT_CACHE.put(object_key, ads)
+        props = ads.get_properties(T)
+        _THERMO_PROPERTY_CACHE.put(property_key, props)
+    
+    return _copy_properties(props)
 
 
 def calc_equilibrium_potential(deltaG: float, n_electrons: int = 1) -> float:
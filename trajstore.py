@@ -0,0 +1,226 @@
+"""
+Compact, memory-mappable trajectory store for merged AIMD runs.
+
+An ASE .traj file stores every frame as a separate record, so slicing a long
+run means decoding frame by frame. A trajectory store is a directory
+(e.g. aimd_sum.npt/) holding:
+    positions.bin   raw float32/float64 array, frames x atoms x 3 (Angstrom)
+    cells.bin       raw float64 array, frames x 3 x 3
+    meta.json       symbols (stored once), pbc, dtype, number of atoms/frames
+Both arrays are opened with np.memmap, so any frame range is a zero-copy view.
+
+usage:
+    python3 trajstore.py aimd_sum.traj (-o aimd_sum.npt) (--dtype float64)
+
+    from trajstore import open_trajstore
+    store = open_trajstore('aimd_sum.npt')
+    xyz = store.positions[1000:2000]      # (1000, n_atoms, 3) view, no copy
+    atoms = store[-1]                     # Atoms of the last frame
+"""
+
+import argparse
+import itertools
+import json
+import os
+
+import numpy as np
+from ase import Atoms
+
+STORE_VERSION = 1
+
+
+class TrajStoreWriter:
+    """
+    Append frames to a trajectory store; the arrays are written as they come.
+
+    meta.json is removed on opening and written (atomically) only by close(),
+    so an interrupted conversion never leaves a store that looks complete.
+    """
+
+    def __init__(self, path, symbols, pbc=True, dtype='float32'):
+        self.path = path
+        self.symbols = list(symbols)
+        self.pbc = np.broadcast_to(pbc, 3).astype(bool).tolist()
+        self.dtype = np.dtype(dtype)
+        self.n_frames = 0
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        self._positions = open(os.path.join(path, 'positions.bin'), 'wb')
+        self._cells = open(os.path.join(path, 'cells.bin'), 'wb')
+
+    def write(self, atoms=None, positions=None, cell=None):
+        """Append one frame, from atoms or from positions (n_atoms x 3) and cell (3 x 3)."""
+        if atoms is not None:
+            if atoms.get_chemical_symbols() != self.symbols:
+                raise ValueError("Trajectory store needs the same atoms in every frame")
+            positions, cell = atoms.positions, atoms.cell.array
+        positions = np.ascontiguousarray(positions, dtype=self.dtype)
+        if positions.shape != (len(self.symbols), 3):
+            raise ValueError(f"positions must have shape ({len(self.symbols)}, 3)")
+        self._positions.write(positions.tobytes())
+        self._cells.write(np.ascontiguousarray(cell, dtype=np.float64).reshape(3, 3).tobytes())
+        self.n_frames += 1
+
+    def close(self):
+        self._positions.close()
+        self._cells.close()
+        meta = {
+            'version': STORE_VERSION,
+            'symbols': self.symbols,
+            'pbc': self.pbc,
+            'dtype': self.dtype.name,
+            'n_atoms': len(self.symbols),
+            'n_frames': self.n_frames,
+        }
+        meta_path = os.path.join(self.path, 'meta.json')
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TrajStore:
+    """Read-only view of a trajectory store; positions and cells are memory-mapped."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta.get('version') != STORE_VERSION:
+            raise ValueError(f"Unsupported trajectory store version in {path}")
+        self.symbols = meta['symbols']
+        self.pbc = meta['pbc']
+        self.numbers = Atoms(self.symbols).numbers
+        n_atoms = meta['n_atoms']
+        dtype = np.dtype(meta['dtype'])
+        self.positions = self._map('positions.bin', dtype, (n_atoms, 3), meta['n_frames'])
+        self.cells = self._map('cells.bin', np.float64, (3, 3), meta['n_frames'])
+
+    def _map(self, name, dtype, frame_shape, n_frames):
+        file_path = os.path.join(self.path, name)
+        if n_frames == 0:
+            return np.zeros((0,) + frame_shape, dtype=dtype)
+        return np.memmap(file_path, dtype=dtype, mode='r', shape=(n_frames,) + frame_shape)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, i):
+        """Atoms of frame i, or a list of Atoms for a slice."""
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        return Atoms(self.symbols, positions=np.asarray(self.positions[i], dtype=float),
+                     cell=np.array(self.cells[i]), pbc=self.pbc)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def open_trajstore(path):
+    """Open a trajectory store for reading."""
+    return TrajStore(path)
+
+
+def is_trajstore(path):
+    """True if path is a trajectory store directory."""
+    return os.path.isfile(os.path.join(path, 'meta.json'))
+
+
+def iter_frames(path, stride=1):
+    """
+    Yield Atoms frame by frame from an XDATCAR, a trajectory store or any
+    ase-readable trajectory (.traj, .xyz, ...), keeping one frame in memory.
+    """
+    if is_trajstore(path):
+        store = open_trajstore(path)
+        for i in range(0, len(store), stride):
+            yield store[i]
+    elif 'XDATCAR' in os.path.basename(path):
+        from xdatcar import iter_xdatcar
+        yield from iter_xdatcar(path, stride=stride)
+    else:
+        from ase.io import iread
+        yield from iread(path, index=slice(None, None, stride))
+
+
+def iter_chunks(path, stride=1, size=1000):
+    """
+    Yield (positions, cells, pbc) blocks of up to size frames, with positions
+    (n, n_atoms, 3) and cells (n, 3, 3), for array-wise analysis of long runs.
+
+    Stores are sliced straight from the memory map and XDATCAR frames are
+    converted without building Atoms; other formats go through ase iread.
+    """
+    if is_trajstore(path):
+        store = open_trajstore(path)
+        for start in range(0, len(store), size * stride):
+            stop = min(start + size * stride, len(store))
+            yield (np.asarray(store.positions[start:stop:stride], dtype=float),
+                   np.array(store.cells[start:stop:stride]), store.pbc)
+        return
+    if 'XDATCAR' in os.path.basename(path):
+        from xdatcar import iter_indexed_frames, xdatcar_index
+        index = xdatcar_index(path)
+        frames = ((frac @ cell, cell) for _, cell, frac in
+                  iter_indexed_frames(path, range(0, len(index['frames']), stride), index))
+        pbc = True
+    else:
+        from ase.io import iread
+        atoms_iter = iread(path, index=slice(None, None, stride))
+        first = next(atoms_iter, None)
+        if first is None:
+            return
+        pbc = first.pbc.tolist()
+        frames = ((atoms.positions, atoms.cell.array) for atoms in
+                  itertools.chain([first], atoms_iter))
+    while True:
+        block = list(itertools.islice(frames, size))
+        if not block:
+            return
+        yield np.stack([b[0] for b in block]), np.stack([b[1] for b in block]), pbc
+
+
+def convert_traj(input_file, output=None, dtype='float32'):
+    """
+    Convert an ASE trajectory (e.g. aimd_sum.traj) to a trajectory store, frame by frame.
+
+    Returns:
+        Path of the store
+    """
+    from ase.io.trajectory import Trajectory
+
+    if output is None:
+        output = os.path.splitext(input_file)[0] + '.npt'
+    traj = Trajectory(input_file)
+    try:
+        writer = None
+        for atoms in traj:
+            if writer is None:
+                writer = TrajStoreWriter(output, atoms.get_chemical_symbols(), atoms.pbc, dtype)
+            writer.write(atoms)
+    finally:
+        traj.close()
+    if writer is None:
+        raise ValueError(f"{input_file} has no frames")
+    writer.close()
+    return output
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='convert an ASE .traj into a memory-mappable trajectory store')
+    parser.add_argument('input', help='input .traj file')
+    parser.add_argument('-o', '--output', help='output store (default: <input>.npt)')
+    parser.add_argument('--dtype', default='float32', choices=['float32', 'float64'], help='positions dtype')
+    args = parser.parse_args()
+
+    output = convert_traj(args.input, args.output, args.dtype)
+    store = open_trajstore(output)
+    print(f"{len(store)} frames x {len(store.symbols)} atoms written to {output}")
@@ -0,0 +1,108 @@
+"""
+In-process replacement for the `ase convert` command line tool.
+
+Calling `ase convert` through subprocess starts a new interpreter and
+imports ase for every file (1-2 s each). The helpers here do the same
+conversion inside the running script, reuse Atoms that are already in
+memory, and read only the last frame when that is all that is needed
+(OUTCARs go through the backward reader in outcar.py).
+
+Usage:
+    from vasp.ase_convert import convert, read_frame
+
+    convert('OUTCAR', 'full_relax.json')                 # ase convert -f OUTCAR full_relax.json
+    atoms = convert('OUTCAR', 'running.json', index=-1)  # ase convert -f -n -1 OUTCAR running.json
+    convert(None, 'final.json', atoms=atoms)             # write Atoms already in memory
+    atoms = read_frame('final.json')                     # cached read of the last frame
+"""
+import os
+
+from ase.calculators.calculator import all_properties
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.io import read, write
+
+try:
+    from outcar import read_last_frame
+except ImportError:
+    from vasp.outcar import read_last_frame
+
+# (abspath, index) -> ((mtime_ns, size), images)
+_FRAME_CACHE = {}
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _normalize_index(index):
+    if isinstance(index, str) and index != ':':
+        try:
+            return int(index)
+        except ValueError:
+            return index
+    return index
+
+
+def read_frame(path, index=-1):
+    """
+    Read path (last frame by default), reusing the result while the file is unchanged.
+
+    The returned Atoms are shared between calls; copy them before modifying.
+    """
+    index = _normalize_index(index)
+    key = (os.path.abspath(path), index)
+    stamp = _stamp(path)
+    cached = _FRAME_CACHE.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    if index == -1:
+        images = read_last_frame(path)
+    else:
+        images = read(path, index=index)
+    _FRAME_CACHE[key] = (stamp, images)
+    return images
+
+
+def _with_stored_results(atoms):
+    """Copy of atoms whose calculator results are frozen, as if read back from a file."""
+    copy = atoms.copy()
+    if atoms.calc is not None:
+        results = {k: v for k, v in atoms.calc.results.items() if k in all_properties}
+        copy.calc = SinglePointCalculator(copy, **results)
+    return copy
+
+
+def convert(src, dst, index=':', atoms=None, overwrite=True, format=None):
+    """
+    Convert src to dst like `ase convert [-f] [-n index] src dst`.
+
+    Args:
+        src: Input file; ignored when atoms is given
+        dst: Output file, format from its extension unless format is given
+        index: Frames to convert (':' all, -1 last, or any ase index)
+        atoms: Atoms (or list of Atoms) already in memory to write instead of reading src
+        overwrite: Replace an existing dst (the -f flag)
+        format: Output format passed to ase.io.write
+
+    Returns:
+        The Atoms (or list of Atoms) that were written
+    """
+    if os.path.exists(dst) and not overwrite:
+        raise FileExistsError(f"{dst} exists; use overwrite=True")
+    if atoms is None:
+        atoms = read_frame(src, index=index)
+    if isinstance(atoms, (list, tuple)):
+        images = [_with_stored_results(a) for a in atoms]
+    else:
+        images = _with_stored_results(atoms)
+    write(dst, images, format=format)
+    if not isinstance(images, list):
+        # a later read_frame(dst) gets the Atoms just written without parsing
+        _FRAME_CACHE[(os.path.abspath(dst), -1)] = (_stamp(dst), images)
+    return atoms
+
+
+def clear_frame_cache():
+    """Drop all cached frames."""
+    _FRAME_CACHE.clear()
@@ -0,0 +1,127 @@
+"""
+Force-convergence check shared by the restart scripts and status tools.
+
+Per-atom force norms are computed in one NumPy call. Atoms fixed by
+FixAtoms (or by selective dynamics in POSCAR/CONTCAR) are excluded, so a
+frozen bottom layer cannot keep a relaxation "NOT CONVERGED". The DONE /
+NOT_DONE status file is written directly instead of through `echo`.
+
+Usage (python):
+    from vasp.convergence import check_convergence, write_status
+    result = check_convergence(atoms.get_forces(), atoms, fmax=0.03)
+    write_status(result, energy)
+
+Usage (shell):
+    python $play/vasp/convergence.py [OUTCAR|file.traj|file.json] [--fmax 0.03] [--no-write]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+try:
+    from outcar import read_last_frame
+except ImportError:
+    from vasp.outcar import read_last_frame
+
+FMAX = 0.03  # eV/A, same threshold as EDIFFG = -0.03
+
+
+def fixed_mask(atoms=None, directory='.', n_atoms=None):
+    """
+    Boolean mask of fixed atoms.
+
+    Constraints on atoms are used when present; otherwise selective dynamics
+    from CONTCAR or POSCAR in directory (all three directions F) is used.
+    """
+    n = len(atoms) if atoms is not None else n_atoms
+    mask = np.zeros(n, dtype=bool)
+    constraints = list(atoms.constraints) if atoms is not None else []
+    if not constraints:
+        from ase.io import read
+        for name in ('CONTCAR', 'POSCAR'):
+            path = os.path.join(directory, name)
+            if os.path.isfile(path) and os.path.getsize(path) > 0:
+                try:
+                    ref = read(path, format='vasp')
+                except Exception:
+                    continue
+                if len(ref) == n:
+                    constraints = ref.constraints
+                    break
+    for constraint in constraints:
+        name = type(constraint).__name__
+        if name == 'FixAtoms':
+            mask[constraint.get_indices()] = True
+        elif name in ('FixScaled', 'FixCartesian') and np.all(constraint.mask):
+            # selective dynamics "F F F" written per atom
+            mask[constraint.get_indices()] = True
+    return mask
+
+
+def check_convergence(forces, atoms=None, fmax=FMAX, directory='.'):
+    """
+    Max / sum / RMS force norms over the free atoms.
+
+    Args:
+        forces: (n_atoms, 3) force array in eV/A
+        atoms: Atoms whose constraints mark fixed atoms (optional)
+        fmax: Convergence threshold on the largest force norm
+        directory: Where to look for POSCAR/CONTCAR when atoms has no constraints
+
+    Returns:
+        dict with max, sum, rms, max_index, n_free and converged
+    """
+    forces = np.asarray(forces, dtype=float).reshape(-1, 3)
+    norms = np.sqrt(np.einsum('ij,ij->i', forces, forces))
+    free = ~fixed_mask(atoms, directory, n_atoms=len(forces))
+    free_norms = norms[free]
+    if free_norms.size == 0:
+        largest, total, rms, index = 0.0, 0.0, 0.0, -1
+    else:
+        k = int(np.argmax(free_norms))
+        largest = float(free_norms[k])
+        total = float(free_norms.sum())
+        rms = float(np.sqrt(np.mean(free_norms ** 2)))
+        index = int(np.flatnonzero(free)[k])
+    return {
+        'max': largest,
+        'sum': total,
+        'rms': rms,
+        'max_index': index,
+        'n_free': int(free.sum()),
+        'converged': largest < fmax,
+    }
+
+
+def write_status(result, energy, directory='.'):
+    """Write DONE or NOT_DONE (and remove the other one) as the old echo did."""
+    name = 'DONE' if result['converged'] else 'NOT_DONE'
+    stale = os.path.join(directory, 'NOT_DONE' if result['converged'] else 'DONE')
+    if os.path.exists(stale):
+        os.remove(stale)
+    path = os.path.join(directory, name)
+    with open(path, 'w') as f:
+        f.write(f"{os.path.abspath(directory)}  : CONVERGED with ENERGY {energy:.6f} "
+                f"and MAX FORCE of {result['max']:.3f}\n")
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Force convergence of the last frame')
+    parser.add_argument('file', nargs='?', default='OUTCAR', help='OUTCAR, .traj or .json')
+    parser.add_argument('--fmax', type=float, default=FMAX, help='threshold (eV/A)')
+    parser.add_argument('--no-write', action='store_true', help='do not write DONE/NOT_DONE')
+    args = parser.parse_args()
+
+    atoms = read_last_frame(args.file)
+    directory = os.path.dirname(os.path.abspath(args.file))
+    result = check_convergence(atoms.get_forces(), atoms, args.fmax, directory)
+    energy = atoms.get_potential_energy()
+    status = 'CONVERGED' if result['converged'] else 'NOT CONVERGED'
+    print(f"{status}\tE={energy:.6f}\tmax={result['max']:.3f}\tsum={result['sum']:.3f}"
+          f"\trms={result['rms']:.3f}\tfree={result['n_free']}")
+    if not args.no_write:
+        write_status(result, energy, directory)
+    sys.exit(0 if result['converged'] else 1)
@@ -1,10 +1,23 @@
 
 import os
+import re
 import sys
+import json
+import mmap
+import itertools
 import numpy as np
 from ase.io import read, write
 import subprocess
 import logging.config
+import shutil
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+try:
+    from outcar import potcar_element, read_outcar_symbols, read_last_frame
+    from convergence import check_convergence, write_status
+except ImportError:
+    from vasp.outcar import potcar_element, read_outcar_symbols, read_last_frame
+    from vasp.convergence import check_convergence, write_status
 # ================== Logger ================================
 def Logger(file_name):
     formatter = logging.Formatter(fmt='%(asctime)s | %(message)s',
@@ -23,24 +36,179 @@ def Logger(file_name):
     #log_obj.info("Logger object created successfully..")
     return log_obj
 # =======================================================
-logger = Logger('post-process')
+# Configured by Logger() in single-directory mode, or per directory by the batch driver
+logger = logging.getLogger()
 home=os.path.expanduser('~')
 homebin=home+'/bin'
 vtstscript = 'vtstscripts-972'
 vtstscript_path = homebin+'/'+vtstscript
 
+# Open file receiving the chgsum.pl / bader output, None for the terminal;
+# set per directory by the batch driver (bader.log)
+bader_output = None
+
 def run_bader():
-    subprocess.run(['{}/chgsum.pl'.format(vtstscript_path), 'AECCAR0', 'AECCAR2'])
-    subprocess.run(['bader', 'CHGCAR', '-ref', 'CHGCAR_sum'])
+    stderr = subprocess.STDOUT if bader_output is not None else None
+    subprocess.run(['{}/chgsum.pl'.format(vtstscript_path), 'AECCAR0', 'AECCAR2'],
+                   stdout=bader_output, stderr=stderr)
+    subprocess.run(['bader', 'CHGCAR', '-ref', 'CHGCAR_sum'], stdout=bader_output, stderr=stderr)
     return True
 
 
-def get_bader_charges(traj='OUTCAR'):
+# ZVAL (valence electrons of the neutral atom) depends on the POTCAR variant
+# (_sv, _pv, ...), so it is read from the calculation itself and cached per POTCAR
+# path, valid while its mtime and size are unchanged. Entries of another
+# ZVAL_CACHE_VERSION (2: 'H.75' stored as 'H') are scanned again.
+ZVAL_CACHE = os.environ.get('ZVAL_CACHE', os.path.join(home, '.cache', 'vasp_zval.json'))
+ZVAL_CACHE_VERSION = 2
+TITEL_PATTERN = re.compile(rb'TITEL\s*=\s*\S+\s+(\S+)')
+ZVAL_PATTERN = re.compile(rb'POMASS\s*=\s*[-\d.]+;\s*ZVAL\s*=\s*([-\d.]+)')
+
+
+def _scan_potential_headers(mm):
+    """[(element, zval), ...] from the TITEL and POMASS/ZVAL lines of each potential."""
+    titles = [potcar_element(m.group(1).decode()) for m in TITEL_PATTERN.finditer(mm)]
+    zvals = [float(m.group(1)) for m in ZVAL_PATTERN.finditer(mm)]
+    if not titles or len(titles) != len(zvals):
+        raise ValueError("TITEL/ZVAL lines not found or inconsistent")
+    return list(zip(titles, zvals))
+
+
+def _potcar_stamp(potcar):
+    """(realpath, mtime_ns, size) of potcar; stat only, the file is not read."""
+    path = os.path.realpath(potcar)
+    st = os.stat(path)
+    return path, st.st_mtime_ns, st.st_size
+
+
+def _load_zval_cache():
+    try:
+        with open(ZVAL_CACHE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_zval_cache(cache):
+    try:
+        os.makedirs(os.path.dirname(ZVAL_CACHE), exist_ok=True)
+        tmp_path = f"{ZVAL_CACHE}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(cache, f, indent=1)
+        os.replace(tmp_path, ZVAL_CACHE)
+    except OSError as e:
+        logger.warning(f"could not write ZVAL cache {ZVAL_CACHE}: {e}")
+
+
+def read_potcar_zvals(potcar='POTCAR'):
+    """
+    [(element, zval), ...] for each potential in POTCAR.
+
+    Cached by (realpath, mtime, size), so a known POTCAR costs one stat call;
+    it is only scanned when new or changed.
+    """
+    path, mtime_ns, size = _potcar_stamp(potcar)
+    cache = _load_zval_cache()
+    cached = cache.get(path)
+    if (isinstance(cached, dict) and cached.get('version') == ZVAL_CACHE_VERSION
+            and cached.get('mtime_ns') == mtime_ns and cached.get('size') == size):
+        return [tuple(entry) for entry in cached['entries']]
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        entries = _scan_potential_headers(mm)
+    cache[path] = {'version': ZVAL_CACHE_VERSION, 'mtime_ns': mtime_ns, 'size': size, 'entries': entries}
+    _save_zval_cache(cache)
+    return entries
+
+
+def read_outcar_zvals(outcar='OUTCAR'):
+    """[(element, zval), ...] from the POTCAR headers echoed at the top of OUTCAR."""
+    header = []
+    with open(outcar, 'rb') as f:
+        for line in f:
+            header.append(line)
+            if b'ions per type' in line:
+                break
+    return _scan_potential_headers(b''.join(header))
+
+
+def resolve_zvals(symbols, directory='.'):
+    """
+    Per-atom ZVAL for symbols, from directory/POTCAR or else directory/OUTCAR.
+
+    When the element runs of symbols follow the POTCAR order, each run gets the
+    ZVAL of its own potential (so two O potentials are told apart); otherwise
+    values are matched by element.
+    """
+    potcar = os.path.join(directory, 'POTCAR')
+    outcar = os.path.join(directory, 'OUTCAR')
+    if os.path.isfile(potcar):
+        entries = read_potcar_zvals(potcar)
+    elif os.path.isfile(outcar):
+        entries = read_outcar_zvals(outcar)
+    else:
+        raise FileNotFoundError(f"Neither POTCAR nor OUTCAR found in {directory}")
+
+    runs = [(el, len(list(group))) for el, group in itertools.groupby(symbols)]
+    if [el for el, _ in runs] == [el for el, _ in entries]:
+        return np.repeat([z for _, z in entries], [n for _, n in runs]).astype(float)
+
+    by_element = {}
+    for el, z in entries:
+        if by_element.setdefault(el, z) != z:
+            logger.warning(f"{el} has several POTCARs with different ZVAL; using {by_element[el]}")
+    missing = sorted(set(symbols) - set(by_element))
+    if missing:
+        raise KeyError(f"No POTCAR found for element(s) {missing}")
+    elements, inverse = np.unique(symbols, return_inverse=True)
+    return np.array([by_element[el] for el in elements], dtype=float)[inverse]
+
+
+def read_acf_charges(acf_file='ACF.dat'):
+    """
+    Bader charges (CHARGE column) from ACF.dat as a float array.
+
+    ACF.dat format:
+        ... header ...
+        ----------------
+           1      x      y      z      CHARGE      MIN_DIST      ATOMIC_VOL
+        ...
+        ----------------
+        VACUUM CHARGE: ...
+    The rows between the two dashed lines are converted in one NumPy call.
+    """
+    with open(acf_file, 'rb') as f:
+        lines = f.read().split(b'\n')
+    dashes = [i for i, line in enumerate(lines) if line.strip().startswith(b'---')]
+    if len(dashes) >= 2:
+        rows = lines[dashes[0] + 1:dashes[1]]
+    else:
+        rows = [line for line in lines if line.split()[:1] and line.split()[0].isdigit()]
+    if not rows:
+        raise ValueError(f"No charge table found in {acf_file}")
+    ncol = len(rows[0].split())
+    if ncol < 5:
+        raise ValueError(f"Unexpected ACF.dat table with {ncol} columns")
+    values = np.array(b' '.join(rows).split(), dtype=float)
+    return values.reshape(-1, ncol)[:, 4]
+
+
+def read_symbols(traj='OUTCAR'):
+    """Chemical symbols of the last frame of traj, without reading the other frames."""
+    if os.path.basename(traj).startswith('OUTCAR'):
+        try:
+            return read_outcar_symbols(traj)
+        except (ValueError, IndexError):
+            pass
+    return read(traj, index=-1).get_chemical_symbols()
+
+
+def get_bader_charges(traj='OUTCAR', verbose=False):
     """
     Calculates net charges for atoms based on Bader analysis (ACF.dat) and a structure file.
     
     Args:
         traj (str): Path to the structure file (e.g., OUTCAR, POSCAR, .traj). Default is 'OUTCAR'.
+        verbose (bool): Print the charge of every atom. Default is False.
         
     Returns:
         list: A list of calculated net charges.
@@ -56,29 +224,15 @@ def get_bader_charges(traj='OUTCAR'):
             return []        
 
     # Parse ACF.dat to get Bader charges
-    # ACF.dat format:
-    # ... header ...
-    #    1      x      y      z      CHARGE      MIN_DIST      ATOMIC_VOL
-    # ...
-    bader_raw_charges = []
     try:
-        with open("ACF.dat", "r") as f:
-            for line in f:
-                parts = line.split()
-                # Data lines start with an integer index and have enough columns
-                if parts and parts[0].isdigit() and len(parts) >= 5:
-                    # Column 5 (index 4) contains the charge
-                    bader_raw_charges.append(float(parts[4]))
+        bader_raw_charges = read_acf_charges("ACF.dat")
     except Exception as e:
         print(f"Error parsing ACF.dat: {e}")
         return []
 
-    bader_raw_charges = np.array(bader_raw_charges)
-
-    # Read structure to get atom symbols
+    # Read structure to get atom symbols (last frame only)
     try:
-        atoms = read(traj)
-        symbols = atoms.get_chemical_symbols()
+        symbols = read_symbols(traj)
     except Exception as e:
         print(f"Error reading structure from {traj}: {e}")
         return []
@@ -88,125 +242,277 @@ def get_bader_charges(traj='OUTCAR'):
         print(f"Error: Number of atoms in {traj} ({len(symbols)}) does not match entries in ACF.dat ({len(bader_raw_charges)}).")
         return []
 
-    # ZVAL (Valence Electron) Dictionary
-    # This defines the reference number of valence electrons for neutral atoms.
-    # Note: These values depend on the specific POTCARs used (e.g. _sv, _pv potentials).
-    zval_dict = {
-        'H': 1, 'Li': 1, 'Na': 1, 'K': 7, 'Rb': 1, 'Cs': 1, # Alkalis
-        'Be': 2, 'Mg': 2, 'Ca': 2, 'Sr': 2, 'Ba': 2,        # Alkaline earths
-        'Sc': 3, 'Y': 11, 'La': 11,                         # Group 3 (Y_sv, La usually 11 in VASP)
-        'Ti': 4, 'Zr': 12.0, 'Hf': 4,                       # Group 4 (Zr_sv=12)
-        'V': 5, 'Nb': 11.0, 'Ta': 5,                        # Group 5 (Nb_pv=11)
-        'Cr': 6, 'Mo': 14, 'W': 6,                          # Group 6 (Mo_pv=14)
-        'Mn': 7, 'Tc': 7.0, 'Re': 7,                        # Group 7
-        'Fe': 8, 'Ru': 8.0, 'Os': 8,                        # Group 8
-        'Co': 9, 'Rh': 9.0, 'Ir': 9,                        # Group 9
-        'Ni': 10, 'Pd': 10.0, 'Pt': 10,                     # Group 10
-        'Cu': 11, 'Ag': 11.0, 'Au': 11,                     # Group 11
-        'Zn': 12, 'Cd': 12.0, 'Hg': 12,                     # Group 12
-        'B': 3, 'Al': 3, 'Ga': 3, 'In': 3.0, 'Tl': 3,       # Group 13
-        'C': 4, 'Si': 4, 'Ge': 4, 'Sn': 4.0, 'Pb': 4,       # Group 14
-        'N': 5, 'P': 5, 'As': 5, 'Sb': 5.0, 'Bi': 5,        # Group 15
-        'O': 6, 'S': 6, 'Se': 6, 'Te': 6, 'Po': 6,          # Group 16
-        'F': 7, 'Cl': 7, 'Br': 7, 'I': 7,                   # Group 17
-        'Ce': 12, 'Sm': 11                                  # Lanthanides (VASP specific)
-    }
+    # Net Charge = ZVAL - Bader Charge, with ZVAL from this calculation's POTCAR
+    try:
+        zvals = resolve_zvals(symbols, os.path.dirname(os.path.abspath(traj)))
+    except Exception as e:
+        print(f"Error resolving ZVAL for {traj}: {e}")
+        return []
+    net_charges = zvals - bader_raw_charges
+    elements, inverse = np.unique(symbols, return_inverse=True)
 
-    net_charges = []
     out_filename = 'bader_charges.tsv'
-    
     print(f"Writing charges to {out_filename}...")
-    
+    lines = [f"{i}\t {symbol}\t {charge:.6f}" for i, (symbol, charge)
+             in enumerate(zip(symbols, net_charges.tolist()))]
     with open(out_filename, 'w') as f:
-        f.write("# index\t name\t charge\n")
-        
-        for i, symbol in enumerate(symbols):
-            if symbol not in zval_dict:
-                print(f"Warning: Element {symbol} not in ZVAL dictionary. Net charge set to NaN.")
-                net_charge = float('nan')
-            else:
-                # Net Charge = ZVAL - Bader Charge
-                net_charge = zval_dict[symbol] - bader_raw_charges[i]
-            
-            # Formatting
-            net_charge_round = round(net_charge, 2)
-            net_charges.append(net_charge_round)
-            
-            # Print to stdout and file
-            print(f"index: {i}\t name: {symbol}\t charge: {net_charge:.2f}")
-            f.write(f"{i}\t {symbol}\t {net_charge:.6f}\n")
-
-    return net_charges
+        f.write("# index\t name\t charge\n" + "\n".join(lines) + "\n")
 
-if __name__ == "__main__":
+    if verbose:
+        for i, (symbol, charge) in enumerate(zip(symbols, net_charges.tolist())):
+            print(f"index: {i}\t name: {symbol}\t charge: {charge:.2f}")
+    else:
+        for k, el in enumerate(elements):
+            mask = inverse == k
+            print(f"{el}: {mask.sum()} atoms, mean charge {net_charges[mask].mean():.2f}")
+
+    return np.round(net_charges, 2).tolist()
+
+# Files removed after a successful Bader analysis (CHGCAR is kept for restarts)
+CHARGE_FILES = ['AECCAR0', 'AECCAR1', 'AECCAR2', 'CHG', 'CHGCAR_sum']
+
+
+def post_process(traj_file='OUTCAR', log=None, keep_charge_files=False):
+    """
+    Parse / Bader / restart pipeline for the current directory.
+
+    Writes restart.json (with initial magmoms and Bader charges when
+    available), atoms_bader_charge.json and DONE / NOT_DONE.
+
+    Returns:
+        dict with energy, max_force, converged, charges and magmoms flags
+    """
+    log = log or logger
 
     # if restart.json exists, copy it to initial.json
     if os.path.exists('restart.json'):
-        subprocess.run(['cp', 'restart.json', 'initial.json'])
-        logger.info("copy restart.json to initial.json")
+        shutil.copyfile('restart.json', 'initial.json')
+        log.info("copy restart.json to initial.json")
     else:
-        logger.info("restart.json does not exist")
-
-    # Allow passing trajectory file as argument
-    traj_file = 'OUTCAR'
-    if len(sys.argv) > 1:
-        traj_file = sys.argv[1]
-    write_charge_traj, write_magmom = False, False
-    atoms = read(traj_file)
+        log.info("restart.json does not exist")
+
+    # Last frame only: OUTCARs are read backward from the end in one pass
+    atoms = read_last_frame(traj_file)
     energy = atoms.get_potential_energy()
     forces = atoms.get_forces()
-    logger.info(f"get energy from {traj_file}")
-    logger.info(f"energy: {energy}")
-        
+    log.info(f"get energy from {traj_file}")
+    log.info(f"energy: {energy}")
+
     charges = get_bader_charges(traj_file)
     if charges:
-        logger.info("get bader charges")
-        write_charge_traj=True
-        atoms = read(traj_file)
+        log.info("get bader charges")
         atoms.set_initial_charges(charges)
+        log.info("set initial charges")
         write('atoms_bader_charge.json', atoms)
-        logger.info("write atoms_bader_charge.json")
+        log.info("write atoms_bader_charge.json")
+        if not keep_charge_files:
+            removed = [name for name in CHARGE_FILES if os.path.exists(name)]
+            for name in removed:
+                os.remove(name)
+            if removed:
+                log.info(f"remove {' '.join(removed)}")
     else:
-        print("Error: No charges found. Please run bader analysis first.")
-        write_charge_traj=False
+        log.error("No charges found. Please run bader analysis first.")
+
+    if os.path.exists('INCAR'):
+        with open('INCAR') as f:
+            for line in f:
+                if 'LORBIT' in line and not line.lstrip().startswith('#'):
+                    log.info(line.strip())
     try:
-        os.system("grep LORBIT INCAR | grep -v '#' ")
-        moms=atoms.get_magnetic_moments()
-        write_magmom=True
-    except:
-        write_magmom=False
-        if not write_magmom:
-            logger.error("can't get magnetic moments ; LORBIT or SPIN off")
-
-    if write_magmom:
-        moms=atoms.get_magnetic_moments()
+        moms = atoms.get_magnetic_moments()
         atoms.set_initial_magnetic_moments(moms)
-        logger.info("set initial magnetic moments")
-    
-    if write_charge_traj:
-        atoms.set_initial_charges(charges)
-        logger.info("set initial charges")
-        write('atoms_bader_charge.json', atoms)
-        logger.info("write atoms_bader_charge.json")
-        # remove AECCAR0, AECCAR2, CHG, CHGCAR_sum
-        subprocess.run(['rm', 'AECCAR*', 'CHG*'])
-        logger.info("remove AECCAR* and CHG*")
-    else:
-        print("Error: No charges found. Please run bader analysis first.")
+        log.info("set initial magnetic moments")
+        has_magmoms = True
+    except Exception:
+        log.error("can't get magnetic moments ; LORBIT or SPIN off")
+        has_magmoms = False
+
     write('restart.json', atoms)
-    logger.info("write restart.json")
-    sum=0.0
-    largest=0.0
-    for a in range(len(atoms)):
-        force=np.sqrt(forces[a][0]**2+forces[a][1]**2+forces[a][2]**2)
-        sum+=force
-        if(force>largest):
-            largest=force
-    logger.info(f"largest force: {largest}")
-    logger.info(f"sum of forces: {sum}")
-    if (largest < 0.03):
-        logger.info('CONVERGED')
-        subprocess.check_output("echo $PWD ' : CONVERGED with ENERGY %.6f' and MAX FORCE of %.3f > DONE " %(energy, largest), shell=True)
+    log.info("write restart.json")
+    # fixed atoms (FixAtoms / selective dynamics) do not count
+    result = check_convergence(forces, atoms)
+    log.info(f"largest force: {result['max']}")
+    log.info(f"sum of forces: {result['sum']}")
+    log.info(f"rms force: {result['rms']}")
+    log.info('CONVERGED' if result['converged'] else 'NOT CONVERGED')
+    write_status(result, energy)
+    return {
+        'energy': energy,
+        'max_force': result['max'],
+        'converged': result['converged'],
+        'charges': bool(charges),
+        'magmoms': has_magmoms,
+    }
+
+
+# ================== Batch driver ==========================
+MANIFEST = 'post_process_manifest.json'
+# Written by VASP only at normal termination
+FINISHED_MARKER = b'General timing and accounting informations for this job'
+
+
+def is_finished(directory):
+    """True if directory/OUTCAR ends with VASP's timing summary."""
+    outcar = os.path.join(directory, 'OUTCAR')
+    try:
+        with open(outcar, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - 65536, 0))
+            return FINISHED_MARKER in f.read()
+    except OSError:
+        return False
+
+
+def find_finished_dirs(root='.'):
+    """Finished VASP directories under root, sorted."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+        if 'OUTCAR' in filenames and is_finished(dirpath):
+            found.append(os.path.normpath(dirpath))
+    return found
+
+
+def _outcar_stamp(directory):
+    st = os.stat(os.path.join(directory, 'OUTCAR'))
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _directory_logger(directory):
+    """Logger writing to directory/post-process.log only."""
+    log = logging.getLogger(f'post-process.{os.path.abspath(directory)}')
+    log.setLevel(logging.DEBUG)
+    log.propagate = False
+    for handler in list(log.handlers):
+        log.removeHandler(handler)
+        handler.close()
+    handler = logging.FileHandler(os.path.join(directory, 'post-process.log'), mode='w')
+    handler.setFormatter(logging.Formatter(fmt='%(asctime)s | %(message)s',
+                                           datefmt='%Y/%m/%d %H:%M:%S'))
+    log.addHandler(handler)
+    return log
+
+
+def _run_directory(job):
+    """Pool worker: run post_process inside one directory, return (directory, summary)."""
+    global logger, bader_output
+    directory, keep_charge_files = job
+    cwd = os.getcwd()
+    log = _directory_logger(directory)
+    logger = log
+    try:
+        os.chdir(directory)
+        # keep print() output of the pipeline out of the shared terminal,
+        # and the chgsum.pl / bader output in the directory's bader.log
+        with open(os.devnull, 'w') as devnull, open('bader.log', 'w') as bader_log:
+            stdout, sys.stdout = sys.stdout, devnull
+            bader_output = bader_log
+            try:
+                summary = post_process('OUTCAR', log, keep_charge_files)
+            finally:
+                sys.stdout = stdout
+                bader_output = None
+        summary['status'] = 'done'
+    except Exception as e:
+        log.exception(f"post-process failed: {e}")
+        summary = {'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+    finally:
+        os.chdir(cwd)
+        for handler in log.handlers:
+            handler.close()
+    return directory, summary
+
+
+def _load_manifest(path):
+    """Manifest at path, or {} when it is missing or unreadable (e.g. truncated)."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: ignoring unreadable manifest {path} ({e}); starting a fresh one")
+        return {}
+    if not isinstance(manifest, dict):
+        print(f"Warning: ignoring malformed manifest {path}; starting a fresh one")
+        return {}
+    return manifest
+
+
+def _write_manifest(path, manifest):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def run_batch(root='.', workers=4, dry_run=False, force=False, keep_charge_files=False):
+    """
+    Post-process every finished directory under root in a pool of workers.
+
+    Each directory gets its own post-process.log (and bader.log with the
+    output of chgsum.pl / bader). Progress is recorded in
+    root/post_process_manifest.json after every directory, so an interrupted
+    run can be restarted; directories done with an unchanged OUTCAR are skipped.
+
+    Args:
+        root: Directory searched recursively for finished VASP runs
+        workers: Maximum number of directories processed at once
+        dry_run: Only report what would be processed
+        force: Reprocess directories already in the manifest
+        keep_charge_files: Keep AECCAR*/CHG/CHGCAR_sum after Bader
+
+    Returns:
+        The manifest dict {directory: summary}
+    """
+    manifest_path = os.path.join(root, MANIFEST)
+    manifest = {} if force else _load_manifest(manifest_path)
+
+    todo, skipped = [], []
+    for directory in find_finished_dirs(root):
+        key = os.path.relpath(directory, root)
+        entry = manifest.get(key)
+        if entry and entry.get('status') == 'done' and entry.get('stamp') == _outcar_stamp(directory):
+            skipped.append(key)
+        else:
+            todo.append(key)
+
+    print(f"{len(todo)} directories to process, {len(skipped)} already done")
+    if dry_run:
+        for key in todo:
+            print(f"  would process {key}")
+        return manifest
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_run_directory, (os.path.join(root, key), keep_charge_files)): key
+                   for key in todo}
+        for future in as_completed(futures):
+            key = futures[future]
+            _, summary = future.result()
+            summary['stamp'] = _outcar_stamp(os.path.join(root, key))
+            manifest[key] = summary
+            _write_manifest(manifest_path, manifest)
+            if summary['status'] == 'done':
+                state = 'CONVERGED' if summary['converged'] else 'NOT CONVERGED'
+                print(f"{key}\t{state}\tE={summary['energy']:.6f}\tmax force={summary['max_force']:.3f}")
+            else:
+                print(f"{key}\tERROR\t{summary['error']}")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Bader charges, magmoms and restart.json from a finished run')
+    parser.add_argument('traj', nargs='?', default='OUTCAR', help='structure file (single-directory mode)')
+    parser.add_argument('--root', help='post-process every finished directory under ROOT')
+    parser.add_argument('-j', '--workers', type=int, default=4, help='directories processed at once')
+    parser.add_argument('--dry-run', action='store_true', help='only list the directories to process')
+    parser.add_argument('--force', action='store_true', help='ignore the manifest and redo everything')
+    parser.add_argument('--keep-charge-files', action='store_true', help='keep AECCAR*/CHG/CHGCAR_sum')
+    args = parser.parse_args()
+
+    if args.root:
+        run_batch(args.root, args.workers, args.dry_run, args.force, args.keep_charge_files)
     else:
-        logger.info('NOT CONVERGED')
-        subprocess.check_output("echo $PWD ' : CONVERGED with ENERGY %.6f' and MAX FORCE of %.3f > NOT_DONE " %(energy, largest), shell=True)
+        logger = Logger('post-process')
+        post_process(args.traj, logger, args.keep_charge_files)
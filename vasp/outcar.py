@@ -0,0 +1,169 @@
+"""
+Fast last-frame reader for VASP OUTCAR files.
+
+ase.io.read('OUTCAR') parses every ionic step even when only the final
+structure is needed. Here the OUTCAR is memory-mapped and searched backward
+from the end for the last complete ionic step, so only the header and that
+one step are parsed:
+    - chemical symbols from the TITEL / "ions per type" header
+    - cell from the last "direct lattice vectors" block
+    - positions and forces from the last POSITION / TOTAL-FORCE block
+    - energy(sigma->0) and free energy (TOTEN) from the "FREE ENERGIE OF THE
+      ION-ELECTRON SYSTEM" block that closes the step (the same strings are
+      printed in every SCF iteration, so they are only read from that block)
+    - magnetic moments from the last "magnetization (x)" table of the step
+A step whose FREE ENERGIE block is missing or cut off (run killed during
+the step) is dropped and the previous one is returned, as ase does.
+
+Usage:
+    from outcar import read_outcar_last_frame, read_last_frame
+    atoms = read_outcar_last_frame('OUTCAR')
+    atoms.get_potential_energy(), atoms.get_forces(), atoms.get_magnetic_moments()
+"""
+import mmap
+import os
+
+import numpy as np
+from ase import Atoms
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.io import read
+
+ENERGY_MARKER = b'energy(sigma->0)'
+FREE_ENERGY_MARKER = b'FREE ENERGIE OF THE ION-ELECTRON SYSTEM'
+FREE_ENERGY_BYTES = 2048
+ITERATION_MARKER = b'Iteration'
+TOTEN_MARKER = b'free  energy   TOTEN'
+FORCE_MARKER = b'POSITION                                       TOTAL-FORCE'
+CELL_MARKER = b'direct lattice vectors'
+MAGMOM_MARKER = b'magnetization (x)'
+
+
+def potcar_element(name):
+    """Element of a POTCAR label, as ase does: 'Cu_pv' -> 'Cu', 'H.75' -> 'H'."""
+    return name.split('_')[0].split('.')[0]
+
+
+def read_outcar_symbols(outcar='OUTCAR'):
+    """Chemical symbols from the OUTCAR header (TITEL + ions per type), no ionic steps parsed."""
+    titles, potcars = [], []
+    with open(outcar, 'r') as f:
+        for line in f:
+            if 'TITEL' in line:
+                # e.g. "   TITEL  = PAW_PBE Cu_pv 06Sep2000"
+                titles.append(potcar_element(line.split('=', 1)[1].split()[1]))
+            elif line.lstrip().startswith('POTCAR:'):
+                # e.g. " POTCAR:    PAW_PBE Cu_pv 06Sep2000", printed twice
+                potcars.append(potcar_element(line.split()[2]))
+            elif 'ions per type' in line:
+                counts = [int(n) for n in line.split('=', 1)[1].split()]
+                species = titles if len(titles) == len(counts) else potcars[:len(counts)]
+                if len(species) != len(counts):
+                    break
+                return [s for s, n in zip(species, counts) for _ in range(n)]
+    raise ValueError(f"Species or 'ions per type' not found in {outcar}")
+
+
+def _table_after(mm, pos, n_rows):
+    """The n_rows numeric lines following the dashed line after pos, as a 2D array."""
+    start = mm.find(b'---', pos)
+    start = mm.find(b'\n', start) + 1
+    rows = []
+    while len(rows) < n_rows:
+        end = mm.find(b'\n', start)
+        if end < 0:
+            end = len(mm)
+        line = mm[start:end]
+        start = end + 1
+        if line.strip():
+            rows.append(line)
+        if end == len(mm):
+            break
+    if len(rows) < n_rows:
+        raise ValueError("Incomplete table in OUTCAR")
+    values = np.array(b' '.join(rows).split(), dtype=float)
+    return values.reshape(n_rows, -1)
+
+
+def _float_after(mm, pos, marker):
+    """First number after '=' on the line of marker found at pos."""
+    line = mm[pos:mm.find(b'\n', pos)]
+    return float(line[line.index(b'=', len(marker)) + 1:].split()[0])
+
+
+def _free_energy_block(mm, f_pos):
+    """
+    (free_energy, energy) from the FREE ENERGIE block closing the step whose
+    forces start at f_pos, or None if that block is not (completely) written.
+    """
+    next_forces = mm.find(FORCE_MARKER, f_pos + len(FORCE_MARKER))
+    b_pos = mm.find(FREE_ENERGY_MARKER, f_pos, next_forces if next_forces >= 0 else len(mm))
+    if b_pos < 0:
+        return None
+    # the block is a few lines long; never read into the SCF of the next step
+    limit = min(len(mm), b_pos + FREE_ENERGY_BYTES)
+    next_scf = mm.find(ITERATION_MARKER, b_pos, limit)
+    if next_scf >= 0:
+        limit = next_scf
+    t_pos = mm.find(TOTEN_MARKER, b_pos, limit)
+    e_pos = mm.find(ENERGY_MARKER, b_pos, limit)
+    if t_pos < 0 or e_pos < 0 or mm.find(b'\n', e_pos, limit) < 0:
+        return None
+    return _float_after(mm, t_pos, TOTEN_MARKER), _float_after(mm, e_pos, ENERGY_MARKER)
+
+
+def read_outcar_last_frame(outcar='OUTCAR'):
+    """
+    Atoms of the last complete ionic step in OUTCAR.
+
+    The returned Atoms carries a SinglePointCalculator with energy
+    (energy(sigma->0), as in ase), free_energy (TOTEN), forces and, when the
+    run printed them, magnetic moments.
+    """
+    symbols = read_outcar_symbols(outcar)
+    n_atoms = len(symbols)
+
+    with open(outcar, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # The step is complete once the FREE ENERGIE block after its forces is written
+        f_pos = mm.rfind(FORCE_MARKER)
+        energies = None
+        while f_pos >= 0:
+            energies = _free_energy_block(mm, f_pos)
+            if energies is not None:
+                break
+            f_pos = mm.rfind(FORCE_MARKER, 0, f_pos)
+        if energies is None:
+            raise ValueError(f"No complete ionic step found in {outcar}")
+        free_energy, energy = energies
+        # end of the previous step, so tables of older steps are not picked up
+        prev_step = mm.rfind(FREE_ENERGY_MARKER, 0, f_pos)
+
+        table = _table_after(mm, f_pos, n_atoms)
+        positions, forces = table[:, :3], table[:, 3:6]
+
+        c_pos = mm.rfind(CELL_MARKER, 0, f_pos)
+        if c_pos < 0:
+            raise ValueError(f"No lattice vectors found in {outcar}")
+        c_pos = mm.find(b'\n', c_pos) + 1
+        cell_lines = mm[c_pos:c_pos + 4096].split(b'\n')[:3]
+        cell = np.array([line.split()[:3] for line in cell_lines], dtype=float)
+
+        magmoms = None
+        m_pos = mm.rfind(MAGMOM_MARKER, max(prev_step, 0), f_pos)
+        if m_pos >= 0:
+            # "# of ion  s  p  d  tot" table; the last column is the total moment
+            magmoms = _table_after(mm, m_pos, n_atoms)[:, -1]
+
+    atoms = Atoms(symbols, positions=positions, cell=cell, pbc=True)
+    results = {'energy': energy, 'free_energy': free_energy, 'forces': forces}
+    if magmoms is not None:
+        results['magmoms'] = magmoms
+        results['magmom'] = float(magmoms.sum())
+    atoms.calc = SinglePointCalculator(atoms, **results)
+    return atoms
+
+
+def read_last_frame(path='OUTCAR'):
+    """Last frame of any ase-readable file, using the fast reader for OUTCARs."""
+    if os.path.basename(path).startswith('OUTCAR'):
+        return read_outcar_last_frame(path)
+    return read(path, index=-1)
@@ -2,8 +2,19 @@
 VASP ZPE and thermochemistry from OUTCAR vibrational frequencies.
 Extracts frequencies from OUTCAR (grep THz lines), converts to eV,
 and uses ASE HarmonicThermo / IdealGasThermo like qe_zpe_entropy.py.
+
+Single directory (run inside a vib calculation):
+    python zpe.py
+
+Many directories at once (one consolidated TSV):
+    python zpe.py --root ./vib --status-map status.txt -o thermo.tsv -j 8
 """
 from ase import units
+import argparse
+import json
+import mmap
+import re
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import os
 import sys
@@ -64,27 +75,73 @@ ideal_gas_params = {
 }
 
 
-def extract_frequencies_from_outcar(file_path='OUTCAR'):
+EIGEN_HEADER = b'Eigenvectors and eigenvalues of the dynamical matrix'
+# Markers that end the eigenvalue block (the long dashed line closes the section)
+EIGEN_BLOCK_END = (b'Eigenvectors after division by SQRT(mass)', b'-' * 80)
+
+
+def _parse_mode_line(line):
+    """Vibrational energy in eV from a THz/meV mode line (negative if imaginary)."""
+    tokens = line.split()
+    idx = tokens.index(b'meV')
+    eV_val = float(tokens[idx - 1]) / 1000.0
+    # f/i= means imaginary frequency
+    if b'f/i' in line:
+        eV_val = -abs(eV_val)
+    return eV_val
+
+
+def _parse_modes(lines, return_eigenvectors=False):
+    """Mode energies (eV) and, if asked, the displacement rows following each mode line."""
+    energies_eV = []
+    eigenvectors = []
+    for line in lines:
+        if b'THz' in line and b'meV' in line:
+            energies_eV.append(_parse_mode_line(line))
+            eigenvectors.append([])
+        elif return_eigenvectors and eigenvectors:
+            tokens = line.split()
+            # Displacement lines: X Y Z dx dy dz
+            if len(tokens) == 6 and tokens[0] != b'X':
+                eigenvectors[-1].append([float(t) for t in tokens[3:]])
+    return energies_eV, eigenvectors
+
+
+def extract_frequencies_from_outcar(file_path='OUTCAR', return_eigenvectors=False):
     """
     Extract vibrational frequencies from VASP OUTCAR (lines containing THz).
     Returns list of vibrational energies in eV.
     Real modes: positive eV. Imaginary modes (f/i=): negative eV.
     ASE thermochemistry uses only positive energies; imaginary are excluded.
+
+    The file is memory-mapped and only the last "Eigenvectors and eigenvalues"
+    block is scanned, so multi-GB OUTCARs are not read line by line. If the
+    block header is missing, all THz lines in the file are used (read line by
+    line from the mapping, never copied whole).
+    With return_eigenvectors=True, also returns the (dx, dy, dz) displacements
+    as an array of shape (n_modes, n_atoms, 3).
     """
-    energies_eV = []
-    with open(file_path, 'r') as f:
-        for line in f:
-            if 'THz' not in line or 'meV' not in line:
-                continue
-            # f/i= means imaginary frequency
-            is_imaginary = 'f/i' in line
-            tokens = line.split()
-            idx = tokens.index('meV')
-            meV_val = float(tokens[idx - 1])
-            eV_val = meV_val / 1000.0
-            if is_imaginary:
-                eV_val = -abs(eV_val)
-            energies_eV.append(eV_val)
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            energies_eV, eigenvectors = [], []
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = mm.rfind(EIGEN_HEADER)
+                if start < 0:
+                    # no block header: scan the mapped file in place, one line at a time
+                    lines = iter(mm.readline, b'')
+                else:
+                    start += len(EIGEN_HEADER)
+                    end = len(mm)
+                    for marker in EIGEN_BLOCK_END:
+                        pos = mm.find(marker, start + 80)
+                        if 0 <= pos < end:
+                            end = pos
+                    lines = mm[start:end].split(b'\n')
+                energies_eV, eigenvectors = _parse_modes(lines, return_eigenvectors)
+
+    if return_eigenvectors:
+        return energies_eV, np.array(eigenvectors, dtype=float)
     return energies_eV
 
 
@@ -118,16 +175,27 @@ def _vibrational_energy_contribution(temperature, vib_energies, verbose=False):
     return dU
 
 
-def get_free_energies(vib_energies, temperature=300, fugacity=1e5):
-    """Same interface as qe_zpe_entropy: gas vs ads from cwd path."""
+def get_free_energies(vib_energies, temperature=300, fugacity=1e5,
+                      status=None, gas_name=None, workdir=None):
+    """
+    Same interface as qe_zpe_entropy: gas vs ads from cwd path.
+
+    status ('gas' or 'ads') and gas_name can be given explicitly; otherwise
+    they are inferred from the working directory as before. workdir is where
+    qn.traj is read from when the gas is not in the ase database.
+    """
     vib_real = vib_energies_for_thermo(vib_energies)
     if not vib_real:
         raise ValueError("No real (positive) vibrational frequencies for thermochemistry.")
-    pwd = os.getcwd()
-    if 'gases' in pwd and HAS_CATMAP:
-        status = 'gas'
+    pwd = os.path.abspath(workdir) if workdir else os.getcwd()
+    if status is None:
+        status = 'gas' if 'gases' in pwd and HAS_CATMAP else 'ads'
+    if status == 'gas':
+        if not HAS_CATMAP:
+            raise ImportError("catmap is required for gas phase thermochemistry.")
         molecule = catmap.molecule
-        gas_name = os.path.basename(pwd)
+        if gas_name is None:
+            gas_name = os.path.basename(pwd)
         if gas_name == 'H2_ref':
             gas_name = 'H2'
         gas_name_g = gas_name + '_g'
@@ -139,7 +207,7 @@ def get_free_energies(vib_energies, temperature=300, fugacity=1e5):
             atoms = molecule(gas_name)
         except Exception:
             print(f"Error: {gas_name} not in ase database; reading qn.traj")
-            atoms = read('qn.traj')
+            atoms = read(os.path.join(pwd, 'qn.traj'))
         therm = IdealGasThermo(
             vib_real, geometry,
             atoms=atoms, symmetrynumber=symmetry,
@@ -164,7 +232,258 @@ def get_free_energies(vib_energies, temperature=300, fugacity=1e5):
         return status, ZPE, U, F, Cpv, dS, TS
 
 
-if __name__ == "__main__":
+# ---------------------------------------------------------------------------
+# Batch mode: many vib directories -> one TSV
+# ---------------------------------------------------------------------------
+
+SIGMA0_PATTERN = re.compile(rb'energy\(sigma->0\)\s*=\s*(-?\d+\.\d+)')
+IBRION_PATTERN = re.compile(r'^\s*IBRION\s*=\s*(-?\d+)', re.MULTILINE)
+# Columns read by FormationEnergyCalculator come first
+BATCH_COLUMNS = ['surface_name', 'site_name', 'species_name', 'type', 'fugacity',
+                 'raw_energy', 'frequencies', 'temperature', 'ZPE', 'Cp', 'TS', 'F',
+                 'n_imag', 'directory']
+
+
+def extract_reference_energy(file_path='OUTCAR'):
+    """Energy(sigma->0) of the first ionic step (the undisplaced geometry), or None."""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            match = SIGMA0_PATTERN.search(mm)
+            return float(match.group(1)) if match else None
+
+
+def is_vib_dir(path):
+    """True if path holds a finite-difference/DFPT vib run (IBRION 5-8)."""
+    incar = os.path.join(path, 'INCAR')
+    outcar = os.path.join(path, 'OUTCAR')
+    if not os.path.isfile(outcar):
+        return False
+    if os.path.isfile(incar):
+        with open(incar) as f:
+            match = IBRION_PATTERN.search(f.read())
+        if match:
+            return 5 <= int(match.group(1)) <= 8
+    # No INCAR (or no IBRION tag): look for the eigenvalue block itself
+    with open(outcar, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm.rfind(EIGEN_HEADER) >= 0
+
+
+def find_vib_dirs(root):
+    """All vib calculation directories under root, sorted."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+        if 'OUTCAR' in filenames and is_vib_dir(dirpath):
+            found.append(os.path.normpath(dirpath))
+    return found
+
+
+def read_status_map(file_path, root='.'):
+    """
+    Read the per-directory status map.
+
+    Each non-comment line is whitespace separated:
+        directory  status  [species_name  [surface_name  [site_name]]]
+    status is 'gas' or 'ads'. Directories are relative to root. Missing
+    species_name defaults to the directory name; use '-' to leave a field empty.
+    """
+    entries = {}
+    with open(file_path) as f:
+        for lineno, line in enumerate(f, 1):
+            tokens = line.split('#', 1)[0].split()
+            if not tokens:
+                continue
+            if len(tokens) < 2:
+                raise ValueError(f"{file_path}:{lineno}: expected 'directory status'")
+            status = tokens[1].lower()
+            if status not in ('gas', 'ads'):
+                raise ValueError(f"{file_path}:{lineno}: status must be 'gas' or 'ads', got {tokens[1]!r}")
+            fields = [None if t == '-' else t for t in tokens[2:5]]
+            fields += [None] * (3 - len(fields))
+            directory = os.path.normpath(os.path.join(root, tokens[0]))
+            entries[directory] = {
+                'status': status,
+                'species_name': fields[0],
+                'surface_name': fields[1],
+                'site_name': fields[2],
+            }
+    return entries
+
+
+def _source_stamp(directory):
+    """(mtime_ns, size) of the OUTCAR; changes whenever the run is redone."""
+    st = os.stat(os.path.join(directory, 'OUTCAR'))
+    return [st.st_mtime_ns, st.st_size]
+
+
+def process_vib_dir(directory, status, species_name=None, surface_name=None,
+                    site_name=None, temperature=300, fugacity=1e5):
+    """Thermochemistry of one vib directory as a row for the batch TSV."""
+    outcar = os.path.join(directory, 'OUTCAR')
+    frequencies = extract_frequencies_from_outcar(outcar)
+    species_name = species_name or os.path.basename(os.path.abspath(directory))
+    if status == 'gas':
+        results = get_free_energies(frequencies, temperature, fugacity=fugacity,
+                                    status='gas', gas_name=species_name,
+                                    workdir=directory)
+        _, ZPE, Cp, H, dS_1bar2p, dS, TS, F = results
+        site_name = site_name or 'gas'
+    else:
+        results = get_free_energies(frequencies, temperature, status='ads',
+                                    workdir=directory)
+        _, ZPE, U, F, Cp, dS, TS = results
+        fugacity = None
+    if species_name == 'H2_ref':
+        species_name = 'H2'
+    return {
+        'surface_name': surface_name or '',
+        'site_name': site_name or '',
+        'species_name': species_name,
+        'type': status,
+        'fugacity': fugacity,
+        'raw_energy': extract_reference_energy(outcar),
+        # cm^-1, real modes only, like the frequencies column of the data sets
+        'frequencies': [e / units.invcm for e in vib_energies_for_thermo(frequencies)],
+        'temperature': temperature,
+        'ZPE': float(ZPE),
+        'Cp': float(Cp),
+        'TS': float(TS),
+        'F': float(F),
+        'n_imag': sum(1 for e in frequencies if e < 0),
+        'directory': directory,
+    }
+
+
+def _process_job(job):
+    """Pool worker: returns (directory, row or None, error message or None)."""
+    directory, kwargs = job
+    try:
+        return directory, process_vib_dir(directory, **kwargs), None
+    except Exception as exc:
+        return directory, None, f"{type(exc).__name__}: {exc}"
+
+
+def _format_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def write_batch_tsv(rows, file_path):
+    """Write batch rows to a TSV readable by FormationEnergyCalculator."""
+    tmp_path = file_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write('\t'.join(BATCH_COLUMNS) + '\n')
+        for row in rows:
+            f.write('\t'.join(_format_value(row[col]) for col in BATCH_COLUMNS) + '\n')
+    os.replace(tmp_path, file_path)
+
+
+def run_batch(root='.', status_map=None, output='thermo.tsv', temperature=300,
+              fugacity=1e5, workers=None, default_status=None, force=False,
+              verbose=True):
+    """
+    Compute ZPE/thermo corrections for every vib directory under root.
+
+    Args:
+        root: Directory searched recursively for vib runs
+        status_map: Path to a status map file (see read_status_map) or a dict
+                    {directory: 'gas' | 'ads' | dict of fields}
+        output: Consolidated TSV; a manifest (output + '.manifest.json') records
+                what each row was computed from
+        temperature: Temperature in K
+        fugacity: Gas fugacity in Pa
+        workers: Number of worker processes (None: os.cpu_count())
+        default_status: Status for directories missing from the map; if None
+                        they are skipped
+        force: Recompute all directories, even if unchanged
+        verbose: Print progress
+
+    Returns:
+        List of row dicts written to output
+    """
+    if status_map is None:
+        entries = {}
+    elif isinstance(status_map, dict):
+        entries = {}
+        for directory, value in status_map.items():
+            fields = {'status': value} if isinstance(value, str) else dict(value)
+            entries[os.path.normpath(os.path.join(root, directory))] = fields
+    else:
+        entries = read_status_map(status_map, root)
+
+    manifest_path = output + '.manifest.json'
+    manifest = {}
+    if not force and os.path.isfile(manifest_path):
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+
+    rows = {}
+    jobs = []
+    n_skipped = 0
+    for directory in find_vib_dirs(root):
+        fields = entries.get(directory)
+        if fields is None:
+            if default_status is None:
+                if verbose:
+                    print(f"Skipping {directory}: not in status map")
+                continue
+            fields = {'status': default_status}
+        kwargs = {
+            'status': fields['status'],
+            'species_name': fields.get('species_name'),
+            'surface_name': fields.get('surface_name'),
+            'site_name': fields.get('site_name'),
+            'temperature': temperature,
+            'fugacity': fugacity,
+        }
+        stamp = _source_stamp(directory)
+        previous = manifest.get(directory)
+        if previous and previous['stamp'] == stamp and previous['settings'] == kwargs:
+            rows[directory] = previous['row']
+            n_skipped += 1
+            continue
+        jobs.append((directory, kwargs, stamp))
+
+    if verbose:
+        print(f"{len(jobs)} vib directories to process, {n_skipped} unchanged")
+
+    new_manifest = {d: manifest[d] for d in rows}
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_process_job, [(d, kw) for d, kw, _ in jobs])
+            for (directory, kwargs, stamp), (_, row, error) in zip(jobs, results):
+                if error:
+                    print(f"Error in {directory}: {error}")
+                    continue
+                rows[directory] = row
+                new_manifest[directory] = {'stamp': stamp, 'settings': kwargs, 'row': row}
+                if verbose:
+                    print(f"{directory}\t{row['type']}\tZPE={row['ZPE']:.3f}\tF={row['F']:.3f}")
+
+    ordered = [rows[d] for d in sorted(rows)]
+    write_batch_tsv(ordered, output)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(new_manifest, f, indent=1)
+    os.replace(tmp_path, manifest_path)
+    if verbose:
+        print(f"Wrote {len(ordered)} rows to {output}")
+    return ordered
+
+
+def run_single():
+    """Original single-directory mode: thermo of ./OUTCAR appended to thermo.txt."""
     sys.stdout = DualOutput("thermo.txt")
     now = datetime.now()
     print("=" * 60)
@@ -203,3 +522,25 @@ if __name__ == "__main__":
         status, ZPE, U, F, Cpv, dS, TS = get_free_energies(frequencies, T)
         print(f"{T}\t {ZPE:.3f}\t {Cpv:.3f}\t {TS:.3f}\t {F:.3f}")
     print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='ZPE and thermochemistry from VASP vib runs')
+    parser.add_argument('--root', help='process every vib directory under ROOT (batch mode)')
+    parser.add_argument('--status-map', help='per-directory status map for batch mode')
+    parser.add_argument('--default-status', choices=['gas', 'ads'],
+                        help='status for directories not in the map (default: skip them)')
+    parser.add_argument('-o', '--output', default='thermo.tsv', help='batch output TSV')
+    parser.add_argument('-T', '--temperature', type=float, default=300, help='temperature (K)')
+    parser.add_argument('--fugacity', type=float, default=1e5, help='gas fugacity (Pa)')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='worker processes')
+    parser.add_argument('--force', action='store_true', help='recompute unchanged directories')
+    args = parser.parse_args()
+
+    if args.root:
+        if not args.status_map and not args.default_status:
+            parser.error('batch mode needs --status-map and/or --default-status')
+        run_batch(args.root, args.status_map, args.output, args.temperature,
+                  args.fugacity, args.workers, args.default_status, args.force)
+    else:
+        run_single()
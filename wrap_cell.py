@@ -1,12 +1,16 @@
 """
 Ara Cho, May, 2023 @SUNCAT
 description: wrap cell and merge multiple XDATCAR files into one trajectory file
-usage: python3 wrap_cell.py -i [input_files] (-o [output_file])
+usage: python3 wrap_cell.py -i [input_files] (-o [output_file]) (-c [cutoff]) (-s [stride]) (-f npt)
+XDATCARs are read frame by frame through a cached frame index, so memory use does not grow
+with the run length and stride/cutoff frames are reached by seeking.
 """
 
-from ase.io.vasp import read_vasp_xdatcar
 from ase.io.trajectory import Trajectory
 from ase.io import read, write
+from xdatcar import iter_xdatcar
+from trajstore import TrajStoreWriter
+import itertools
 import sys
 import os
 import argparse  
@@ -15,6 +19,9 @@ parser = argparse.ArgumentParser()
 parser.add_argument('-i', '--input', help='input file(s)', type=str, nargs='+')
 parser.add_argument('-o', '--output', help='output file', type=str)
 parser.add_argument('-c', '--cutoff', help='cutoff iteration of first file', type=int)
+parser.add_argument('-s', '--stride', help='write every n-th frame', type=int, default=1)
+parser.add_argument('-f', '--format', help='traj: ASE trajectory, npt: memory-mappable trajectory store',
+                    choices=['traj', 'npt'], default='traj')
 args = parser.parse_args()
 
 if args.input:
@@ -37,7 +44,7 @@ if args.input:
         multi=True
 else:
     if os.path.exists('XDATCAR'):
-        input_files='XDATCAR'
+        input_files=['XDATCAR']
         multi=True
     else:
         print("Usage: python3 wrap_cell.py -i [input_files]")
@@ -60,22 +67,35 @@ if args.cutoff:
 else:
     cutoff=1
 if multi:
-    if len(input_files) > 1:
+    if len(input_files) == 1 and not args.output:
+        output_file='aimd.traj'
+    if args.format == 'npt':
+        output_file=os.path.splitext(output_file)[0]+'.npt'
+        traj2=None  # created from the first frame (symbols are stored once)
+    else:
         traj2=Trajectory(output_file, 'w')
-        print("Multiple input files are given. The output file is aimd_sum.traj")
+    if len(input_files) > 1:
+        print(f"Multiple input files are given. The output file is {output_file}")
     else:
-        traj2=Trajectory('aimd.traj', 'w')
-        print("The output file is aimd.traj")
+        print(f"The output file is {output_file}")
 
+    stride=args.stride
+    n_written=0
     for i, input_file in enumerate(input_files):
-        traj = read_vasp_xdatcar(input_file,index=0)
-        for j, atoms in enumerate(traj):
-            if i==0 and j in list(range(1,cutoff)):
-                continue
-            atoms.set_cell([atoms.cell[0],atoms.cell[1],atoms.cell[2]],scale_atoms=True)
-            atoms.wrap()
+        if i==0 and cutoff > 1:
+            # first frame, then from the cutoff iteration on
+            frames = itertools.chain(iter_xdatcar(input_file, 0, 1, wrap=True),
+                                     iter_xdatcar(input_file, cutoff, None, stride, wrap=True))
+        else:
+            frames = iter_xdatcar(input_file, 0, None, stride, wrap=True)
+        for atoms in frames:
+            if traj2 is None:
+                traj2=TrajStoreWriter(output_file, atoms.get_chemical_symbols(), atoms.pbc)
             traj2.write(atoms)
-    print(f"total iterations: {len(traj2)}")
+            n_written+=1
+    if traj2 is not None:
+        traj2.close()
+    print(f"total iterations: {n_written}")
     print(f"wrap_cell.py is successfully done")
 else:
     atoms=read(input_files)
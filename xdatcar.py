@@ -0,0 +1,299 @@
+"""
+Streaming XDATCAR reader.
+
+ase.io.vasp.read_vasp_xdatcar(index=0) builds every frame in memory before
+returning. Long AIMD runs (50k+ frames) do not fit on login nodes, so here
+frames are parsed one at a time: each "Direct configuration" block is read
+as a single NumPy conversion and yielded before the next one is touched.
+Constant- and variable-cell XDATCARs (header repeated per frame) are both
+handled.
+
+For random access, xdatcar_index() records the byte offsets of every frame
+in one scan and caches them next to the file (.XDATCAR.idx.npz). When the
+XDATCAR grows during a running MD only the new part is scanned. With the
+index, reading frame N or the last frame is a single seek.
+
+usage:
+    from xdatcar import iter_xdatcar, read_xdatcar_frame
+    for atoms in iter_xdatcar('XDATCAR', stride=10, wrap=True):
+        ...
+    atoms = read_xdatcar_frame('XDATCAR', -1)
+"""
+
+import itertools
+import mmap
+import os
+from collections import deque
+
+import numpy as np
+from ase import Atoms
+
+
+def wrap_fractional(frac):
+    """Fractional coordinates wrapped into [0, 1) (same double modulo as ase's wrap)."""
+    frac = np.mod(frac, 1.0)
+    return np.mod(frac, 1.0, out=frac)
+
+
+def _parse_header(lines):
+    """(symbols, cell) from the 7 header lines: title, scale, 3 lattice vectors, symbols, counts."""
+    scale = float(lines[1].split()[0])
+    cell = np.array([line.split()[:3] for line in lines[2:5]], dtype=float)
+    if scale < 0:
+        # negative scale is the cell volume
+        scale = (-scale / abs(np.linalg.det(cell))) ** (1.0 / 3.0)
+    cell *= scale
+    species = lines[5].split()
+    counts = [int(n) for n in lines[6].split()]
+    symbols = [s.split('/')[0].split('_')[0] for s, n in zip(species, counts) for _ in range(n)]
+    return symbols, cell
+
+
+def iter_xdatcar_frames(path='XDATCAR', start=0, stop=None, stride=1):
+    """
+    Yield (symbols, cell, fractional positions) for frames[start:stop:stride].
+
+    Skipped frames are stepped over without converting their coordinates.
+    symbols and cell are shared between frames until the header changes.
+    A trailing frame that is still being written is ignored.
+    """
+    if start < 0 or (stop is not None and stop < 0) or stride < 1:
+        raise ValueError("start/stop must be non-negative and stride positive")
+    with open(path, 'r') as f:
+        header = []
+        symbols, cell = None, None
+        n = -1
+        for line in f:
+            if 'configuration' not in line:
+                header.append(line)
+                continue
+            if len(header) >= 7:
+                symbols, cell = _parse_header(header[-7:])
+            header = []
+            if symbols is None:
+                raise ValueError(f"{path}: no header before the first configuration")
+            n += 1
+            if stop is not None and n >= stop:
+                return
+            block = itertools.islice(f, len(symbols))
+            if n < start or (n - start) % stride:
+                deque(block, maxlen=0)
+                continue
+            block = list(block)
+            if len(block) < len(symbols):
+                return
+            frac = np.array(''.join(block).split(), dtype=float).reshape(len(symbols), -1)[:, :3]
+            yield symbols, cell, frac
+
+
+def iter_xdatcar(path='XDATCAR', start=0, stop=None, stride=1, wrap=False, use_index=True):
+    """
+    Yield frames of an XDATCAR as Atoms, one at a time.
+
+    Args:
+        path: XDATCAR file
+        start, stop, stride: Frame slice, like frames[start:stop:stride]
+        wrap: Wrap positions into the cell
+        use_index: Seek to the selected frames through the cached frame index
+                   (negative start/stop allowed); otherwise stream the file
+                   from the top (start/stop must be non-negative)
+
+    Yields:
+        Atoms with pbc=True
+    """
+    if use_index:
+        index = xdatcar_index(path)
+        selected = range(len(index['frames']))[start:stop:stride]
+        frames = iter_indexed_frames(path, selected, index)
+    else:
+        frames = iter_xdatcar_frames(path, start, stop, stride)
+    for symbols, cell, frac in frames:
+        if wrap:
+            frac = wrap_fractional(frac)
+        yield Atoms(symbols, scaled_positions=frac, cell=cell, pbc=True)
+
+
+# ---------------------------------------------------------------------------
+# Byte-offset frame index
+# ---------------------------------------------------------------------------
+
+CONFIG_MARKER = b'configuration'
+HEADER_LINES = 7
+INDEX_VERSION = 1
+SIGNATURE_BYTES = 1024
+
+
+def index_path(path):
+    """Cache file of the frame index: .<name>.idx.npz next to path."""
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f'.{name}.idx.npz')
+
+
+def _line_start_before(mm, pos, n_lines):
+    """Offset of the line n_lines above the line starting at pos."""
+    for _ in range(n_lines):
+        pos = mm.rfind(b'\n', 0, pos - 1) + 1
+    return pos
+
+
+def _header_at(mm, offset):
+    """(symbols, cell) of the header starting at offset."""
+    lines = []
+    pos = offset
+    for _ in range(HEADER_LINES):
+        end = mm.find(b'\n', pos)
+        lines.append(mm[pos:end].decode())
+        pos = end + 1
+    return _parse_header(lines)
+
+
+def _scan(mm, pos, header_offset, n_atoms):
+    """
+    Index the complete frames from byte pos on.
+
+    Returns (coordinate offsets, header offsets, end offsets, header_offset, n_atoms),
+    the last two being the state to resume from.
+    """
+    starts = []
+    c = mm.find(CONFIG_MARKER, pos)
+    while c >= 0:
+        starts.append(mm.rfind(b'\n', 0, c) + 1)
+        c = mm.find(CONFIG_MARKER, c + len(CONFIG_MARKER))
+
+    frames, headers, ends = [], [], []
+    for k, line_start in enumerate(starts):
+        if line_start > pos:
+            # text between the previous frame and this one is a (new) header
+            header_offset = _line_start_before(mm, line_start, HEADER_LINES)
+            n_atoms = len(_header_at(mm, header_offset)[0])
+        coord = mm.find(b'\n', line_start) + 1
+        if coord == 0:
+            break
+        if k + 1 < len(starts):
+            following = starts[k + 1]
+            n_lines = mm[coord:following].count(b'\n')
+            if n_lines == n_atoms:
+                end = following
+            elif n_lines == n_atoms + HEADER_LINES:
+                end = _line_start_before(mm, following, HEADER_LINES)
+            else:
+                raise ValueError(f"Frame {len(frames)} has {n_lines} lines, expected {n_atoms}")
+        else:
+            chunk = mm[coord:]
+            parts = chunk.split(b'\n', n_atoms)
+            if len(parts) <= n_atoms:
+                # last frame still being written
+                break
+            end = coord + len(chunk) - len(parts[-1])
+        frames.append(coord)
+        headers.append(header_offset)
+        ends.append(end)
+        pos = end
+    return frames, headers, ends, header_offset, n_atoms
+
+
+def xdatcar_index(path='XDATCAR', use_cache=True):
+    """
+    Byte offsets of every complete frame in an XDATCAR.
+
+    The index is cached in .<name>.idx.npz next to the file. If the file has
+    only grown since (same leading bytes), scanning resumes after the last
+    indexed frame; otherwise it is rebuilt.
+
+    Returns:
+        dict with int64 arrays 'frames' (start of the coordinates), 'ends'
+        (end of the coordinates) and 'headers' (offset of the header that
+        applies to each frame)
+    """
+    st = os.stat(path)
+    cache = index_path(path)
+    with open(path, 'rb') as f:
+        if st.st_size == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return {'frames': empty, 'ends': empty, 'headers': empty}
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            signature = np.frombuffer(mm[:SIGNATURE_BYTES], dtype=np.uint8)
+            frames, headers, ends = [], [], []
+            pos, header_offset, n_atoms = 0, 0, 0
+            if use_cache and os.path.exists(cache):
+                try:
+                    with np.load(cache) as data:
+                        stored = {key: data[key] for key in data.files}
+                    valid = (int(stored['version']) == INDEX_VERSION
+                             and st.st_size >= int(stored['size'])
+                             and np.array_equal(stored['signature'], signature))
+                except (OSError, ValueError, KeyError):
+                    valid = False
+                if valid:
+                    if st.st_size == int(stored['size']) and st.st_mtime_ns == int(stored['mtime']):
+                        return {key: stored[key] for key in ('frames', 'ends', 'headers')}
+                    frames = stored['frames'].tolist()
+                    headers = stored['headers'].tolist()
+                    ends = stored['ends'].tolist()
+                    if ends:
+                        pos = ends[-1]
+                        header_offset = headers[-1]
+                        n_atoms = int(stored['n_atoms'])
+
+            new = _scan(mm, pos, header_offset, n_atoms)
+            frames += new[0]
+            headers += new[1]
+            ends += new[2]
+            n_atoms = new[4]
+
+    index = {
+        'frames': np.array(frames, dtype=np.int64),
+        'ends': np.array(ends, dtype=np.int64),
+        'headers': np.array(headers, dtype=np.int64),
+    }
+    if use_cache:
+        try:
+            tmp_path = f"{cache}.{os.getpid()}.tmp.npz"
+            np.savez(tmp_path, version=INDEX_VERSION, size=st.st_size, mtime=st.st_mtime_ns,
+                     n_atoms=n_atoms, signature=signature, **index)
+            os.replace(tmp_path, cache)
+        except OSError:
+            pass
+    return index
+
+
+def iter_indexed_frames(path='XDATCAR', frames=None, index=None):
+    """
+    Yield (symbols, cell, fractional positions) for the given frame numbers.
+
+    Args:
+        path: XDATCAR file
+        frames: Iterable of frame numbers (negative counts from the end);
+                None for all frames
+        index: Result of xdatcar_index(path), built if not given
+    """
+    if index is None:
+        index = xdatcar_index(path)
+    n_frames = len(index['frames'])
+    if frames is None:
+        frames = range(n_frames)
+    headers = {}
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for n in frames:
+            if not -n_frames <= n < n_frames:
+                raise IndexError(f"frame {n} out of range for {n_frames} frames in {path}")
+            offset = int(index['headers'][n])
+            if offset not in headers:
+                headers = {offset: _header_at(mm, offset)}
+            symbols, cell = headers[offset]
+            block = mm[int(index['frames'][n]):int(index['ends'][n])]
+            frac = np.array(block.split(), dtype=float).reshape(len(symbols), -1)[:, :3]
+            yield symbols, cell, frac
+
+
+def read_xdatcar_frame(path='XDATCAR', n=-1, wrap=False, index=None):
+    """Frame n (negative counts from the end) of an XDATCAR as Atoms, via the frame index."""
+    symbols, cell, frac = next(iter_indexed_frames(path, [n], index))
+    if wrap:
+        frac = wrap_fractional(frac)
+    return Atoms(symbols, scaled_positions=frac, cell=cell, pbc=True)
+
+
+def count_xdatcar_frames(path='XDATCAR'):
+    """Number of complete frames in an XDATCAR."""
+    return len(xdatcar_index(path)['frames'])